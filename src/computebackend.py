@@ -0,0 +1,282 @@
+import numpy as np
+from scipy import integrate
+
+from kernels import get_kernels, has_compiler
+
+
+class ReferenceBackend:
+    # the original scalar formulation of the curve numerics, the other backends are checked against it
+    NAME: str = "reference"
+
+    def __init__(self):
+        self.kernels = get_kernels(False)
+
+    def get_name(self):
+        return self.NAME
+
+    @staticmethod
+    def solve_splines(x, y):
+        count = len(x)
+        a = np.copy(y)
+        b = np.zeros(count - 1)
+        d = np.zeros(count - 1)
+        h = np.zeros(count - 1)
+        alpha = np.zeros(count - 1)
+        for i in range(0, count - 1):
+            h[i] = x[i + 1] - x[i]
+        for i in range(1, count - 1):
+            alpha[i] = (3 / h[i]) * (a[i + 1] - a[i]) - (3 / h[i - 1]) * (a[i] - a[i - 1])
+        c = np.zeros(count)
+        l = np.zeros(count)
+        l[0] = 1
+        mu = np.zeros(count)
+        z = np.zeros(count)
+        for i in range(1, count - 1):
+            l[i] = 2 * (x[i + 1] - x[i - 1]) - h[i - 1] * mu[i - 1]
+            mu[i] = h[i] / l[i]
+            z[i] = (alpha[i] - h[i - 1] * z[i - 1]) / l[i]
+        l[count - 1] = 1
+        for j in range(count - 2, -1, -1):
+            c[j] = z[j] - mu[j] * c[j + 1]
+            b[j] = (a[j + 1] - a[j]) / h[j] - (h[j] * (c[j + 1] + 2 * c[j])) / 3
+            d[j] = (c[j + 1] - c[j]) / (3 * h[j])
+        return np.stack((a[0:count - 1], b[0:count - 1], c[0:count - 1], d[0:count - 1], x[0:count - 1]))
+
+    @staticmethod
+    def evaluate(P_x, P_y, P_z, t_ps, segments):
+        # positions and unit tangents at t_ps, segments holds the spline segment of each t_p
+        positions = np.zeros((len(t_ps), 3))
+        tangents = np.zeros((len(t_ps), 3))
+        for k in range(len(t_ps)):
+            t_p = t_ps[k]
+            i = segments[k]
+            for axis, P in enumerate((P_x, P_y, P_z)):
+                positions[k, axis] = P[0, i] + P[1, i] * (t_p - P[4, i]) + P[2, i] * (t_p - P[4, i]) ** 2 + P[3, i] * (
+                        t_p - P[4, i]) ** 3
+            T_ij = np.array([P[1, i] + 2 * P[2, i] * (t_p - P[4, i]) + 3 * P[3, i] * (t_p - P[4, i]) ** 2
+                             for P in (P_x, P_y, P_z)])
+            if np.linalg.norm(T_ij) != 0:
+                T_ij = (1 / np.linalg.norm(T_ij)) * T_ij
+            tangents[k] = T_ij
+        return positions, tangents
+
+    def solve_xy_basis(self, T_ij, T_base, N_base, B_base):
+        return self.kernels['solve_xy_basis'](T_ij, T_base, N_base, B_base)
+
+    def solve_plane_rotation(self, T_ij, N_ij, B_ij, ref_N_ij, ref_B_ij):
+        return self.kernels['solve_plane_rotation'](T_ij, N_ij, B_ij, ref_N_ij, ref_B_ij)
+
+    def propagate_frames(self, tangents, T_base, N_base, B_base, ref_N_ij, ref_B_ij):
+        return self.kernels['propagate_frames'](tangents, T_base, N_base, B_base, ref_N_ij, ref_B_ij)
+
+    def arc_lengths(self, P_x, P_y, P_z, start, stops):
+        return np.array([integrate.quad(self.gamma_dt_norm, start, stop, args=(P_x, P_y, P_z))[0] for stop in stops])
+
+    def helix_arc_lengths(self, coefficients, start, stops):
+        # coefficients is the (H, 3, 5) table of an interval, the result holds every helix at every stop as (H, V)
+        return np.array([[integrate.quad(self.helix_gamma_dt_norm, start, stop, args=tuple(helix))[0]
+                          for stop in stops] for helix in coefficients]).reshape(-1, len(stops))
+
+    def mod_walk(self, l_helix, l_ref, mod_length, cycle):
+        return self.kernels['mod_walk'](l_helix, l_ref, mod_length, cycle)
+
+    def twist_pairs(self, lengths, ranks, alpha, rad_nm, twist_tol, targets):
+        return self.kernels['twist_pairs'](np.ascontiguousarray(lengths), ranks, alpha, rad_nm, twist_tol, targets)
+
+    @staticmethod
+    def gamma_dt_norm(t_p, P_x, P_y, P_z):
+        # t_p may be a scalar or an array, a knot belongs to the segment that ends at it
+        i = np.maximum(np.searchsorted(P_x[4, :], t_p) - 1, 0)
+        dx = P_x[1, i] + 2 * P_x[2, i] * (t_p - P_x[4, i]) + 3 * P_x[3, i] * (t_p - P_x[4, i]) ** 2
+        dy = P_y[1, i] + 2 * P_y[2, i] * (t_p - P_y[4, i]) + 3 * P_y[3, i] * (t_p - P_y[4, i]) ** 2
+        dz = P_z[1, i] + 2 * P_z[2, i] * (t_p - P_z[4, i]) + 3 * P_z[3, i] * (t_p - P_z[4, i]) ** 2
+        return np.sqrt(dx ** 2 + dy ** 2 + dz ** 2)
+
+    @staticmethod
+    def helix_gamma_dt_norm(t_p, P_xh, P_yh, P_zh):
+        dx = P_xh[1] + 2 * P_xh[2] * (t_p - P_xh[4]) + 3 * P_xh[3] * (t_p - P_xh[4]) ** 2
+        dy = P_yh[1] + 2 * P_yh[2] * (t_p - P_yh[4]) + 3 * P_yh[3] * (t_p - P_yh[4]) ** 2
+        dz = P_zh[1] + 2 * P_zh[2] * (t_p - P_zh[4]) + 3 * P_zh[3] * (t_p - P_zh[4]) ** 2
+        return np.sqrt(dx ** 2 + dy ** 2 + dz ** 2)
+
+
+class NumpyBackend(ReferenceBackend):
+    # whole-array formulation, the spline solve is a sequential sweep and stays with the reference. The frames are
+    # evaluated with the same floating point operations as the reference, since the plane rotation may choose
+    # between two equally close angles, only the arc lengths differ from it in rounding
+    NAME: str = "numpy"
+    GAUSS_NODES, GAUSS_WEIGHTS = np.polynomial.legendre.leggauss(16)
+    PLANE_ANGLES = np.arange(65) * np.pi / 32
+
+    @staticmethod
+    def norms(v):
+        # np.linalg.norm of a single vector is the square root of its dot product with itself
+        return np.sqrt((v[..., np.newaxis, :] @ v[..., :, np.newaxis])[..., 0, 0])
+
+    @classmethod
+    def evaluate(cls, P_x, P_y, P_z, t_ps, segments):
+        # scalar powers go through pow, np.float_power does the same for arrays
+        positions = np.zeros((len(t_ps), 3))
+        tangents = np.zeros((len(t_ps), 3))
+        for axis, P in enumerate((P_x, P_y, P_z)):
+            P = P[:, segments]
+            d = t_ps - P[4]
+            positions[:, axis] = P[0] + P[1] * d + P[2] * np.float_power(d, 2) + P[3] * np.float_power(d, 3)
+            tangents[:, axis] = P[1] + 2 * P[2] * d + 3 * P[3] * np.float_power(d, 2)
+        norms = cls.norms(tangents)
+        tangents[norms != 0] = (1 / norms[norms != 0])[:, np.newaxis] * tangents[norms != 0]
+        return positions, tangents
+
+    def solve_xy_basis(self, T_ij, T_base, N_base, B_base):
+        N_ijs, B_ijs = self.solve_xy_bases(T_ij[np.newaxis, :], T_base, N_base, B_base)
+        return N_ijs[0], B_ijs[0]
+
+    @classmethod
+    def solve_xy_bases(cls, tangents, T_base, N_base, B_base):
+        c = np.cross(T_base, tangents)
+        d = (tangents[:, np.newaxis, :] @ T_base[:, np.newaxis])[:, 0, 0]
+        parallel = (c[:, 0] == 0) & (c[:, 1] == 0) & (c[:, 2] == 0)
+        Z = np.zeros((len(tangents), 3, 3))
+        Z[:, 0, 1] = -c[:, 2]
+        Z[:, 0, 2] = c[:, 1]
+        Z[:, 1, 0] = c[:, 2]
+        Z[:, 1, 2] = -c[:, 0]
+        Z[:, 2, 0] = -c[:, 1]
+        Z[:, 2, 1] = c[:, 0]
+        c_norms = np.where(parallel, 1, np.float_power(cls.norms(c), 2))
+        R = (np.identity(3) + Z + (Z @ Z) * (1 - d)[:, np.newaxis, np.newaxis] / c_norms[:, np.newaxis, np.newaxis]) / (
+                np.linalg.norm(T_base) ** 2)
+        R[parallel] = ((np.sign(d[parallel]) * (cls.norms(tangents[parallel]) / np.linalg.norm(T_base)))[
+                       :, np.newaxis, np.newaxis] * np.identity(3))
+        return R @ N_base, R @ B_base
+
+    @staticmethod
+    def rotation_matrices(A, thetas):
+        cos = np.cos(thetas)
+        sin = np.sin(thetas)
+        R = np.empty((len(thetas), 3, 3))
+        R[:, 0, 0] = A[0] * A[0] * (1 - cos) + cos
+        R[:, 0, 1] = A[0] * A[1] * (1 - cos) - A[2] * sin
+        R[:, 0, 2] = A[0] * A[2] * (1 - cos) + A[1] * sin
+        R[:, 1, 0] = A[0] * A[1] * (1 - cos) + A[2] * sin
+        R[:, 1, 1] = A[1] * A[1] * (1 - cos) + cos
+        R[:, 1, 2] = A[1] * A[2] * (1 - cos) - A[0] * sin
+        R[:, 2, 0] = A[0] * A[2] * (1 - cos) - A[1] * sin
+        R[:, 2, 1] = A[1] * A[2] * (1 - cos) + A[0] * sin
+        R[:, 2, 2] = A[2] * A[2] * (1 - cos) + cos
+        return R
+
+    def solve_plane_rotation(self, T_ij, N_ij, B_ij, ref_N_ij, ref_B_ij):
+        # the grid search keeps the first closest angle, and the closest of the later angles that did not improve
+        # on the ones before them
+        R = self.rotation_matrices(T_ij, self.PLANE_ANGLES)
+        d = self.norms(R @ N_ij - ref_N_ij) + self.norms(R @ B_ij - ref_B_ij)
+        n_0 = int(np.argmin(d))
+        later = np.nonzero(d[1:] >= np.minimum.accumulate(d)[:-1])[0] + 1
+        if len(later) > 0:
+            n_1 = later[np.argmin(d[later])]
+            theta_1 = self.PLANE_ANGLES[n_1]
+            d_lim_1 = d[n_1]
+        else:
+            theta_1 = np.nan
+            d_lim_1 = np.inf
+        return self.kernels['refine_plane_rotation'](T_ij, N_ij, B_ij, ref_N_ij, ref_B_ij, self.PLANE_ANGLES[n_0], d[n_0],
+                                                     theta_1, d_lim_1)
+
+    def propagate_frames(self, tangents, T_base, N_base, B_base, ref_N_ij, ref_B_ij):
+        # the xy bases only depend on the base frame, the plane rotations depend on the previous frame
+        N_ijs, B_ijs = self.solve_xy_bases(tangents, T_base, N_base, B_base)
+        for k in range(len(tangents)):
+            ref_N_ij, ref_B_ij = self.solve_plane_rotation(tangents[k], N_ijs[k], B_ijs[k], ref_N_ij, ref_B_ij)
+            N_ijs[k] = ref_N_ij
+            B_ijs[k] = ref_B_ij
+        return N_ijs, B_ijs
+
+    def gauss_pieces(self, bounds):
+        # Gauss-Legendre nodes and weights of the pieces between consecutive bounds as (nodes, pieces) arrays
+        half = np.diff(bounds) / 2
+        t_ps = (bounds[:-1] + half)[np.newaxis, :] + half[np.newaxis, :] * self.GAUSS_NODES[:, np.newaxis]
+        return t_ps, half[np.newaxis, :] * self.GAUSS_WEIGHTS[:, np.newaxis]
+
+    def arc_lengths(self, P_x, P_y, P_z, start, stops):
+        # the speed is smooth between the knots, so the pieces are split at the knots as well as at the stops
+        stops = np.asarray(stops, dtype=float)
+        if len(stops) == 0:
+            return np.zeros(0)
+        knots = P_x[4, 1:]
+        bounds = np.unique(np.concatenate(([start], stops, knots[(knots > start) & (knots < np.max(stops))])))
+        t_ps, weights = self.gauss_pieces(bounds)
+        lengths = np.concatenate(([0], np.cumsum(np.sum(weights * self.gamma_dt_norm(t_ps, P_x, P_y, P_z), axis=0))))
+        return lengths[np.searchsorted(bounds, stops)]
+
+    def helix_arc_lengths(self, coefficients, start, stops):
+        stops = np.asarray(stops, dtype=float)
+        P = np.asarray(coefficients, dtype=float).reshape(-1, 3, 5)[:, :, :, np.newaxis, np.newaxis]
+        bounds = np.unique(np.concatenate(([start], stops)))
+        t_ps, weights = self.gauss_pieces(bounds)
+        d = t_ps - P[:, :, 4]
+        speeds = np.sqrt(np.sum((P[:, :, 1] + 2 * P[:, :, 2] * d + 3 * P[:, :, 3] * d ** 2) ** 2, axis=1))
+        lengths = np.concatenate((np.zeros((len(P), 1)), np.cumsum(np.sum(weights * speeds, axis=1), axis=1)), axis=1)
+        return lengths[:, np.searchsorted(bounds, stops)]
+
+    def mod_walk(self, l_helix, l_ref, mod_length, cycle):
+        # the helices are walked together, checkpoint by checkpoint
+        marks = np.zeros(l_helix.shape)
+        lengths = np.empty(l_helix.shape)
+        mod_counts = np.zeros(l_helix.shape[0])
+        for v in range(l_helix.shape[1]):
+            length = l_helix[:, v] + mod_counts * mod_length
+            lengths[:, v] = length % cycle
+            marks[:, v] = np.where(length - l_ref[v] >= mod_length, 1, np.where(length - l_ref[v] <= -mod_length, -1, 0))
+            mod_counts -= marks[:, v]
+        return marks, lengths
+
+    def twist_pairs(self, lengths, ranks, alpha, rad_nm, twist_tol, targets):
+        targets = targets[ranks][:, ranks]
+        delta_1 = np.abs(lengths[:, np.newaxis] * rad_nm + alpha - targets[:, :, 1])
+        delta_2 = np.abs(lengths[np.newaxis, :] * rad_nm + alpha - targets[:, :, 2])
+        neighbours = targets[:, :, 0] != 0
+        in_phase = neighbours & (delta_1 < twist_tol) & (delta_2 < twist_tol)
+        opposite = neighbours & (np.abs(delta_1 - np.pi) < twist_tol) & (np.abs(delta_2 - np.pi) < twist_tol)
+        return np.where(in_phase, 1, np.where(opposite, 2, 0))
+
+
+class CompiledBackend(NumpyBackend):
+    # the array parts of the NumPy backend with the sequential loops compiled by Numba
+    NAME: str = "compiled"
+
+    def __init__(self):
+        super().__init__()
+        self.kernels = get_kernels(True)
+
+    def solve_xy_basis(self, T_ij, T_base, N_base, B_base):
+        return self.kernels['solve_xy_basis'](T_ij, T_base, N_base, B_base)
+
+    def solve_plane_rotation(self, T_ij, N_ij, B_ij, ref_N_ij, ref_B_ij):
+        return self.kernels['solve_plane_rotation'](T_ij, N_ij, B_ij, ref_N_ij, ref_B_ij)
+
+    def propagate_frames(self, tangents, T_base, N_base, B_base, ref_N_ij, ref_B_ij):
+        return self.kernels['propagate_frames'](tangents, T_base, N_base, B_base, ref_N_ij, ref_B_ij)
+
+    def mod_walk(self, l_helix, l_ref, mod_length, cycle):
+        return self.kernels['mod_walk'](l_helix, l_ref, mod_length, cycle)
+
+    def twist_pairs(self, lengths, ranks, alpha, rad_nm, twist_tol, targets):
+        return self.kernels['twist_pairs'](np.ascontiguousarray(lengths), ranks, alpha, rad_nm, twist_tol, targets)
+
+
+BACKENDS = {backend.NAME: backend for backend in (ReferenceBackend, NumpyBackend, CompiledBackend)}
+INSTANCES = {}
+
+
+def get_backend_names():
+    return [name for name in BACKENDS if name != CompiledBackend.NAME or has_compiler()]
+
+
+def get_backend(name):
+    # the compiled backend falls back to the NumPy one without Numba
+    if name not in get_backend_names():
+        name = NumpyBackend.NAME if name == CompiledBackend.NAME else ReferenceBackend.NAME
+    if name not in INSTANCES:
+        INSTANCES[name] = BACKENDS[name]()
+    return INSTANCES[name]
@@ -0,0 +1,77 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from PySide6.QtWidgets import QApplication
+
+from computebackend import ReferenceBackend, get_backend_names
+from mainwindow import MainWindow
+from projectfile import ProjectFile
+
+
+def solve_design(window, file_name, backend):
+    window.get_parameters()['cb'] = backend
+    storage = window.scene.get_storage()
+    ProjectFile(window, storage).load(file_name)
+    # embedded and earlier solutions are dropped so that every backend solves the design itself
+    storage.get_curve_cache().clear()
+    start = time.perf_counter()
+    storage.interpolate()
+    elapsed = time.perf_counter() - start
+    maps = {key: (curve.get_mods(), curve.get_twist()) for key, curve in storage.path_curves.items()}
+    return maps, elapsed
+
+
+def compare_maps(expected, actual):
+    differences = []
+    for key in sorted(set(expected) | set(actual)):
+        if key not in expected or key not in actual:
+            differences.append("curve {} is missing from one of the solutions".format(key))
+            continue
+        (mods, twists), (other_mods, other_twists) = expected[key], actual[key]
+        for helix in sorted(set(mods) | set(other_mods)):
+            if helix not in mods or helix not in other_mods:
+                differences.append("helix {} of curve {} is missing from one of the solutions".format(helix, key))
+            elif mods[helix].shape != other_mods[helix].shape or not np.array_equal(mods[helix], other_mods[helix]):
+                differences.append("mod map of helix {} on curve {} differs".format(helix, key))
+            elif twists[helix] != other_twists[helix]:
+                differences.append("twist map of helix {} on curve {} differs".format(helix, key))
+    return differences
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve AutoMod project files with every compute backend and compare "
+                                                 "their mod and twist maps with the reference backend.")
+    parser.add_argument('designs', nargs='+', help="project files (.amod)")
+    parser.add_argument('--backends', default=",".join(get_backend_names()),
+                        help="comma separated backends to check, by default all available ones")
+    arguments = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication(sys.argv[:1])
+    window = MainWindow()
+    backends = [name for name in arguments.backends.split(",") if name != ReferenceBackend.NAME]
+    failures = 0
+    for file_name in arguments.designs:
+        expected, elapsed = solve_design(window, file_name, ReferenceBackend.NAME)
+        print("{}: {} {} curves {:.3f} s".format(file_name, ReferenceBackend.NAME, len(expected), elapsed))
+        for backend in backends:
+            if backend not in get_backend_names():
+                print("{}: {} is not available".format(file_name, backend))
+                continue
+            actual, elapsed = solve_design(window, file_name, backend)
+            differences = compare_maps(expected, actual)
+            print("{}: {} {} curves {:.3f} s {}".format(file_name, backend, len(actual), elapsed,
+                                                       "conforms" if not differences else "DIFFERS"))
+            for difference in differences:
+                print("    " + difference)
+            failures += len(differences) > 0
+    app.quit()
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+import numpy as np
+
+
+class CrossSection:
+    # helix rows are (x_ind, y_ind, pure number, set number or -1), ordered by pure number
+    HELIX_COLUMNS: int = 4
+
+    def __init__(self, lattice_type=None, ref_pos=None, angle=0, transform=None, helices=None, lattice_size=None):
+        self.lattice_type = lattice_type
+        self.lattice_size = lattice_size
+        self.ref_pos = ref_pos
+        self.angle = angle
+        self.transform = transform
+        self.helices = np.empty((0, self.HELIX_COLUMNS), dtype=int)
+        self.positions = None
+        self.users = 0
+        if helices is not None:
+            self.set_helices(helices)
+
+    def copy(self):
+        return CrossSection(self.lattice_type, self.ref_pos, self.angle, self.transform, self.helices.copy(),
+                            self.lattice_size)
+
+    def acquire(self):
+        self.users += 1
+        return self
+
+    def release(self):
+        self.users -= 1
+
+    def is_shared(self):
+        return self.users > 1
+
+    def get_lattice_type(self):
+        return self.lattice_type
+
+    def get_lattice_size(self, default=None):
+        # the lattice always reaches the helices placed on it, whatever size it was drawn with
+        size = default if self.lattice_size is None else self.lattice_size
+        if len(self.helices) >= 1:
+            x_max, y_max = np.max(self.helices[:, 0:2], axis=0).tolist()
+            size = max(size or 0, x_max + 1, y_max // 2 + 1 if self.lattice_type == 1 else y_max + 1)
+        return size
+
+    def set_lattice_size(self, lattice_size):
+        self.lattice_size = lattice_size
+
+    def get_ref_pos(self):
+        return self.ref_pos
+
+    def set_ref_pos(self, ref_pos):
+        self.ref_pos = ref_pos
+
+    def get_angle(self):
+        return self.angle
+
+    def set_angle(self, angle):
+        self.angle = angle
+
+    def get_transform(self):
+        return self.transform
+
+    def set_transform(self, transform):
+        self.transform = transform
+
+    def get_helices(self):
+        return self.helices
+
+    def set_helices(self, helices):
+        self.helices = self.sort_helices(helices)
+        self.positions = None
+
+    def has_helices(self, helices):
+        return np.array_equal(self.helices, self.sort_helices(helices))
+
+    @classmethod
+    def sort_helices(cls, helices):
+        helices = np.array(helices, dtype=int).reshape(-1, cls.HELIX_COLUMNS)
+        return helices[np.lexsort((helices[:, 1], helices[:, 0], helices[:, 2]))]
+
+    def get_count(self):
+        return len(self.helices)
+
+    def get_numbers(self):
+        return np.where(self.helices[:, 3] >= 0, self.helices[:, 3], self.helices[:, 2])
+
+    def get_positions(self, parameters):
+        # nodes sharing this cross section reuse the coordinates until hd or ihg change
+        key = (parameters['hd'], parameters['ihg'])
+        if self.positions is None or self.positions[0] != key:
+            self.positions = (key, self.lattice_positions(self.lattice_type, self.helices[:, 0], self.helices[:, 1],
+                                                          parameters))
+        return self.positions[1]
+
+    def get_helix_positions(self, parameters):
+        return dict(zip(self.get_numbers().tolist(), map(tuple, self.get_positions(parameters).tolist())))
+
+    @staticmethod
+    def lattice_positions(lattice_type, x_ind, y_ind, parameters):
+        # same arithmetic as HelixPoint.recalc_pos, so that the coordinates agree bit for bit
+        rd = (parameters['hd'] * 10) / 2 + (parameters['ihg'] * 10) / 2
+        if lattice_type == 1:
+            dx = np.sqrt(3) * rd
+            x_pos = x_ind * 2 * dx + np.isin(y_ind % 4, (1, 2)) * dx
+            y_pos = y_ind * rd + (y_ind // 2) * rd
+        else:
+            x_pos = rd + x_ind * 2 * rd
+            y_pos = rd + y_ind * 2 * rd
+        return np.stack((x_pos, y_pos), axis=-1).astype(float).reshape(-1, 2)
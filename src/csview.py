@@ -5,7 +5,7 @@ import numpy as np
 from PySide6.QtWidgets import QGraphicsView
 from PySide6.QtCore import Qt, QPointF
 
-from helixpoint import HelixPoint
+from helixpoint import HelixPoint, LatticeItem
 
 
 class CSView(QGraphicsView):
@@ -36,12 +36,12 @@ class CSView(QGraphicsView):
 
     def enable_helix_editing(self):
         for item in self.scene().items():
-            if isinstance(item, HelixPoint):
+            if isinstance(item, (HelixPoint, LatticeItem)):
                 item.enable_editing()
 
     def disable_helix_editing(self):
         for item in self.scene().items():
-            if isinstance(item, HelixPoint):
+            if isinstance(item, (HelixPoint, LatticeItem)):
                 item.disable_editing()
 
     def enable_helix_renumbering(self):
@@ -0,0 +1,186 @@
+import json
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+
+class CurveCache:
+    DEFAULT_BUDGET: int = 64 * 1024 ** 2
+
+    def __init__(self, budget=DEFAULT_BUDGET):
+        self.budget = budget
+        self.solutions = OrderedDict()
+        self.sizes = {}
+        self.size = 0
+
+    def get_budget(self):
+        return self.budget
+
+    def set_budget(self, budget):
+        self.budget = budget
+        self.evict()
+
+    def get_size(self):
+        return self.size
+
+    def get(self, key):
+        if key in self.solutions:
+            self.solutions.move_to_end(key)
+            return self.solutions[key]
+        return None
+
+    def put(self, key, solution):
+        if key in self.solutions:
+            self.discard(key)
+        size = self.solution_size(solution)
+        if size > self.budget:
+            return
+        self.solutions[key] = solution
+        self.sizes[key] = size
+        self.size += size
+        self.evict()
+
+    def discard(self, key):
+        del self.solutions[key]
+        self.size -= self.sizes.pop(key)
+
+    def evict(self):
+        while self.size > self.budget and len(self.solutions) >= 1:
+            self.discard(next(iter(self.solutions)))
+
+    def clear(self):
+        self.solutions.clear()
+        self.sizes.clear()
+        self.size = 0
+
+    @classmethod
+    def solution_size(cls, value):
+        if isinstance(value, np.ndarray):
+            return value.nbytes
+        elif isinstance(value, dict):
+            return sum(cls.solution_size(key) + cls.solution_size(item) for key, item in value.items())
+        elif isinstance(value, (list, tuple)):
+            return 8 * len(value) + sum(cls.solution_size(item) for item in value)
+        else:
+            return 8
+
+
+class DiskCurveCache:
+    VERSION: int = 1
+    DEFAULT_BUDGET: int = 256 * 1024 ** 2
+
+    def __init__(self, directory, layout, budget=DEFAULT_BUDGET):
+        self.directory = directory
+        # files written for another solution layout are dropped on the first read
+        self.version = np.array([self.VERSION, layout])
+        self.budget = budget
+        os.makedirs(self.directory, exist_ok=True)
+
+    def get_budget(self):
+        return self.budget
+
+    def set_budget(self, budget):
+        self.budget = budget
+        self.evict()
+
+    def path(self, key):
+        return os.path.join(self.directory, "{}.npz".format(key))
+
+    def get(self, key):
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if not np.array_equal(data['version'], self.version):
+                    os.remove(path)
+                    return None
+                layout = json.loads(str(data['layout']))
+                arrays = {name: data[name] for name in data.files}
+            solution = self.decode(layout, arrays)
+            os.utime(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return solution
+
+    def put(self, key, solution):
+        path = self.path(key)
+        temp_path = "{}.{}.tmp".format(path, os.getpid())
+        try:
+            arrays = {}
+            layout = self.encode(solution, arrays)
+            arrays['version'] = self.version
+            arrays['layout'] = np.array(json.dumps(layout))
+            with open(temp_path, 'wb') as file:
+                np.savez(file, **arrays)
+            os.replace(temp_path, path)
+        except (OSError, TypeError):
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.npz'):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        size = sum(entry[1] for entry in entries)
+        for mtime, entry_size, path in sorted(entries):
+            if size <= self.budget:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            size -= entry_size
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith('.npz'):
+                os.remove(os.path.join(self.directory, name))
+
+    @classmethod
+    def encode(cls, value, arrays):
+        if isinstance(value, np.ndarray):
+            name = "array_{}".format(len(arrays))
+            arrays[name] = value
+            return {'array': name}
+        elif isinstance(value, dict):
+            return {'dict': [[cls.encode(key, arrays), cls.encode(item, arrays)] for key, item in value.items()]}
+        elif isinstance(value, list):
+            return {'list': [cls.encode(item, arrays) for item in value]}
+        elif isinstance(value, tuple):
+            return {'tuple': [cls.encode(item, arrays) for item in value]}
+        elif isinstance(value, (bool, np.bool_)):
+            return {'bool': bool(value)}
+        elif isinstance(value, (int, np.integer)):
+            return {'int': int(value)}
+        elif isinstance(value, np.floating):
+            return {'float64': float(value)}
+        elif isinstance(value, (float, str)) or value is None:
+            return {type(value).__name__: value}
+        else:
+            raise TypeError("cannot store {} in the curve cache".format(type(value).__name__))
+
+    @classmethod
+    def decode(cls, layout, arrays):
+        kind, value = next(iter(layout.items()))
+        if kind == 'array':
+            return arrays[value]
+        elif kind == 'dict':
+            return {cls.decode(key, arrays): cls.decode(item, arrays) for key, item in value}
+        elif kind == 'list':
+            return [cls.decode(item, arrays) for item in value]
+        elif kind == 'tuple':
+            return tuple(cls.decode(item, arrays) for item in value)
+        elif kind == 'float64':
+            return np.float64(value)
+        else:
+            return value
@@ -5,8 +5,6 @@ from PySide6.QtCore import Qt, QPointF
 from PySide6.QtGui import QTransform
 from PySide6.QtWidgets import QGraphicsView
 
-from nodepoint import NodePoint
-
 
 class CurveView(QGraphicsView):
 
@@ -259,24 +257,21 @@ class CurveView(QGraphicsView):
                                 ((event.y() - self.height()/2) / self.transform().m22()) / 2)
             if self.add_points:
                 self.scene.get_storage().add_node_point(event_pos)
-            elif self.connect_points and self.scene.get_storage().has_node_at(event_pos):
-                for item in self.scene.items():
-                    if isinstance(item, NodePoint) and item.has_selection():
-                        subseq_node = self.scene.get_storage().get_node_at(event_pos)
+            elif self.connect_points:
+                subseq_node = self.scene.get_storage().get_node_at(event_pos)
+                if subseq_node is not None:
+                    item = self.scene.get_storage().get_selected_node()
+                    if item is not None:
                         if ((item.get_next_node() is None) and (subseq_node.get_prev_node() is None) and
                                 (item is not subseq_node)):
-                            item.set_next_node(subseq_node)
-                            subseq_node.set_prev_node(item)
-                            self.scene.get_storage().add_path_line(item, subseq_node)
-                            self.scene.get_storage().get_nodes()[item.get_node_index()][3] = subseq_node.get_node_index()
-                            self.scene.get_storage().get_nodes()[subseq_node.get_node_index()][2] = item.get_node_index()
-                else:
-                    self.scene.get_storage().get_node_at(event_pos).mousePressEvent(event)
+                            self.scene.get_storage().link_nodes(item, subseq_node)
+                    subseq_node.mousePressEvent(event)
             elif self.point_x_translation or self.point_y_translation or self.point_z_translation:
                 pass
             else:
-                if self.scene.get_storage().has_node_at(event_pos):
-                    self.scene.get_storage().get_node_at(event_pos).mousePressEvent(event)
+                node_point = self.scene.get_storage().get_node_at(event_pos)
+                if node_point is not None:
+                    node_point.mousePressEvent(event)
 
     def resizeEvent(self, event):
         w1, w2, w3, w4 = self.parent().get_tool_widths()
@@ -0,0 +1,153 @@
+import numpy as np
+
+from gridpoint import GridPoint
+from gridline import GridLine
+
+
+class GridStore:
+
+    def __init__(self, scene, projection):
+        self.scene = scene
+        self.projection = projection
+        self.w = 1
+        self.n = 0
+        self.offset = np.zeros(3, dtype=int)
+        self.points = np.empty((0, 0, 0), dtype=object)
+        self.indices = np.empty((0, 0, 0), dtype=int)
+        self.def_positions = np.empty((0, 0, 0, 3))
+        self.lines = []
+        self.corners = []
+
+    def get_points(self):
+        return self.points.ravel()
+
+    def get_w(self):
+        return self.w
+
+    def get_center(self):
+        return self.w * (self.offset + self.n // 2)
+
+    def lattice_indices(self, axis):
+        # slot a along an axis holds the lattice layer congruent to a modulo n inside the window
+        return self.offset[axis] + np.mod(np.arange(self.n) - self.offset[axis], self.n)
+
+    def lower_slot(self, axis):
+        return self.offset[axis] % self.n
+
+    def upper_slot(self, axis):
+        return (self.offset[axis] + self.n - 1) % self.n
+
+    def slab(self, axis, slot):
+        slab = [slice(None), slice(None), slice(None)]
+        slab[axis] = slot
+        return tuple(slab)
+
+    def lattice_positions(self):
+        k, j, i = np.meshgrid(self.lattice_indices(0), self.lattice_indices(1), self.lattice_indices(2), indexing='ij')
+        return self.w * np.stack((k, j, i), axis=-1)
+
+    def create(self, w, size, center, origin):
+        n = 2 * size + 1
+        self.w = w
+        self.offset = np.array(center, dtype=int) - size
+        if n != self.n:
+            self.remove()
+            self.n = n
+            self.def_positions = self.lattice_positions()
+            self.add_items(origin)
+        else:
+            self.def_positions = self.lattice_positions()
+            indices = self.indices.ravel()
+            self.projection.set_positions(indices, self.def_positions.reshape(-1, 3) + origin)
+            self.projection.update_items(indices)
+            for grid_point, def_pos in zip(self.points.ravel(), self.def_positions.reshape(-1, 3)):
+                grid_point.set_def_pos(def_pos)
+            for axis in range(3):
+                self.relink_lines(axis)
+        self.update_corners()
+
+    def add_items(self, origin):
+        self.points = np.empty((self.n, self.n, self.n), dtype=object)
+        self.indices = np.empty((self.n, self.n, self.n), dtype=int)
+        for slot in np.ndindex(self.n, self.n, self.n):
+            def_pos = self.def_positions[slot]
+            grid_point = GridPoint(self.projection, def_pos + origin, def_pos, False)
+            self.scene.addItem(grid_point)
+            self.points[slot] = grid_point
+            self.indices[slot] = grid_point.get_projection_index()
+        self.lines = []
+        for axis in range(3):
+            start_points = self.points[self.slab(axis, self.lower_slot(axis))]
+            end_points = self.points[self.slab(axis, self.upper_slot(axis))]
+            lines = np.empty((self.n, self.n), dtype=object)
+            for slot in np.ndindex(self.n, self.n):
+                grid_line = GridLine(start_points[slot], end_points[slot], axis)
+                self.scene.addItem(grid_line)
+                lines[slot] = grid_line
+            self.lines.append(lines)
+
+    def remove(self):
+        for lines in self.lines:
+            for grid_line in lines.ravel():
+                self.scene.removeItem(grid_line)
+        for grid_point in self.points.ravel():
+            self.scene.removeItem(grid_point)
+            self.projection.remove_item(grid_point.get_projection_index())
+        self.n = 0
+        self.points = np.empty((0, 0, 0), dtype=object)
+        self.indices = np.empty((0, 0, 0), dtype=int)
+        self.def_positions = np.empty((0, 0, 0, 3))
+        self.lines = []
+        self.corners = []
+
+    def relink_lines(self, axis):
+        start_points = self.points[self.slab(axis, self.lower_slot(axis))]
+        end_points = self.points[self.slab(axis, self.upper_slot(axis))]
+        for grid_line, point_1, point_2 in zip(self.lines[axis].ravel(), start_points.ravel(), end_points.ravel()):
+            grid_line.change_start_point(point_1)
+            grid_line.change_end_point(point_2)
+
+    def update_corners(self):
+        for grid_point in self.corners:
+            grid_point.set_corner(False)
+        self.corners = []
+        for k in (self.lower_slot(0), self.upper_slot(0)):
+            for j in (self.lower_slot(1), self.upper_slot(1)):
+                for i in (self.lower_slot(2), self.upper_slot(2)):
+                    self.points[k, j, i].set_corner(True)
+                    self.corners.append(self.points[k, j, i])
+
+    def shift(self, axis, step):
+        if step > 0:
+            slot = self.lower_slot(axis)
+            layer = self.offset[axis] + self.n
+        else:
+            slot = self.upper_slot(axis)
+            layer = self.offset[axis] - 1
+        self.offset[axis] += step
+        slab = self.slab(axis, slot)
+        indices = self.indices[slab].ravel()
+        positions = self.projection.get_positions(indices)
+        positions[:, axis] += step * self.n * self.w
+        self.projection.set_positions(indices, positions)
+        self.projection.update_items(indices)
+        self.def_positions[slab + (axis,)] = layer * self.w
+        for grid_point, def_pos in zip(self.points[slab].ravel(), self.def_positions[slab].reshape(-1, 3)):
+            grid_point.set_def_pos(def_pos)
+        self.relink_lines(axis)
+        self.update_corners()
+
+    def update(self, limit):
+        steps = np.zeros(3, dtype=int)
+        if self.n == 0:
+            return steps
+        lower = self.projection.get_pos_3d(self.indices[self.lower_slot(0), self.lower_slot(1), self.lower_slot(2)])
+        upper = self.projection.get_pos_3d(self.indices[self.upper_slot(0), self.upper_slot(1), self.upper_slot(2)])
+        for axis in range(3):
+            if np.abs(lower[axis]) <= limit:
+                steps[axis] = -1
+            elif np.abs(upper[axis]) <= limit:
+                steps[axis] = 1
+            if steps[axis] != 0:
+                self.shift(axis, steps[axis])
+        return steps
@@ -0,0 +1,54 @@
+class HelixNumbering:
+    # pure helix numbers are ranks in selection order, counted with a Fenwick tree over selection slots
+
+    def __init__(self):
+        self.tree = [0]
+        self.slots = {}
+        self.next_slot = 0
+
+    def get_count(self):
+        return len(self.slots)
+
+    def add(self, helix):
+        if self.next_slot >= len(self.tree) - 1:
+            self.rebuild()
+        self.slots[helix] = self.next_slot
+        self.update(self.next_slot, 1)
+        self.next_slot += 1
+
+    def remove(self, helix):
+        # returns the helices selected after the removed one, their numbers move down by one
+        slot = self.slots.pop(helix)
+        self.update(slot, -1)
+        return [other for other, other_slot in self.slots.items() if other_slot > slot]
+
+    def get_number(self, helix):
+        return self.prefix(self.slots[helix])
+
+    def update(self, slot, delta):
+        i = slot + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix(self, slot):
+        total = 0
+        i = slot
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def rebuild(self):
+        # compacts the slots of the selected helices and doubles the capacity
+        order = sorted(self.slots, key=self.slots.get)
+        size = max(2 * len(order), 16)
+        self.tree = [0] * (size + 1)
+        self.slots = {helix: slot for slot, helix in enumerate(order)}
+        self.next_slot = len(order)
+        for i in range(1, len(order) + 1):
+            self.tree[i] = 1
+        for i in range(1, size + 1):
+            j = i + (i & -i)
+            if j <= size:
+                self.tree[j] += self.tree[i]
@@ -1,9 +1,12 @@
 import numpy as np
 
-from PySide6.QtWidgets import QGraphicsItem, QGraphicsTextItem
+from PySide6.QtWidgets import QGraphicsItem, QGraphicsTextItem, QStyleOptionGraphicsItem
 from PySide6.QtCore import Qt, QRectF, QPointF
 from PySide6.QtGui import QPen, QBrush
 
+from crosssection import CrossSection
+from helixnumbering import HelixNumbering
+
 
 class ReferencePoint(QGraphicsItem):
     def __init__(self, scene_x, scene_y, radius, parent=None):
@@ -25,9 +28,10 @@ class ReferencePoint(QGraphicsItem):
 
 class HelixPoint(QGraphicsItem):
 
-    def __init__(self, ref_point, x_ind, y_ind, window, lattice_type, parent=None):
+    def __init__(self, ref_point, x_ind, y_ind, window, lattice_type, numbering, parent=None):
         super().__init__(parent)
         self.ref_point = ref_point
+        self.numbering = numbering
         self.x_ind = x_ind
         self.y_ind = y_ind
         if lattice_type == 1:
@@ -46,7 +50,6 @@ class HelixPoint(QGraphicsItem):
                     self.odd = True
                 else:
                     self.odd = False
-        self.count = 0
         self.number = 0
         self.set_number = None
         self.window = window
@@ -62,22 +65,12 @@ class HelixPoint(QGraphicsItem):
         self.recalc_pos()
 
     def recalc_pos(self):
-        if self.lattice_type == 1:
-            rd = (self.window.get_parameters()['hd'] * 10) / 2 + (self.window.get_parameters()['ihg'] * 10) / 2
-            dx = np.sqrt(3) * rd
-            if (self.y_ind % 4) in [0, 3]:
-                x_pos = self.x_ind * 2 * dx + 0 * dx
-            else:
-                x_pos = self.x_ind * 2 * dx + 1 * dx
-            y_pos = self.y_ind * rd + (self.y_ind // 2) * rd
-            self.setPos(x_pos, y_pos)
-            self.text.setPos(2 * self.x() - self.radius, 2 * self.y() - self.radius)
-        elif self.lattice_type == 2:
-            rd = (self.window.get_parameters()['hd'] * 10) / 2 + (self.window.get_parameters()['ihg'] * 10) / 2
-            x_pos = rd + self.x_ind * 2 * rd
-            y_pos = rd + self.y_ind * 2 * rd
-            self.setPos(x_pos, y_pos)
-            self.text.setPos(2 * self.x() - self.radius, 2 * self.y() - self.radius)
+        self.set_lattice_pos(*CrossSection.lattice_positions(self.lattice_type, self.x_ind, self.y_ind,
+                                                             self.window.get_parameters())[0])
+
+    def set_lattice_pos(self, x_pos, y_pos):
+        self.setPos(x_pos, y_pos)
+        self.text.setPos(2 * self.x() - self.radius, 2 * self.y() - self.radius)
 
     def update_radius(self):
         self.radius = (self.window.get_parameters()['hd'] * 10) / 2
@@ -85,14 +78,8 @@ class HelixPoint(QGraphicsItem):
     def update_text_rotation(self):
         self.text.setRotation(-self.window.get_cs_view().get_rotation_amount())
 
-    def increment_count(self):
-        self.count += 1
-
     def get_count(self):
-        return self.count
-
-    def set_count(self, count):
-        self.count = count
+        return self.numbering.get_count()
 
     def enable_editing(self):
         self.editable = True
@@ -108,14 +95,13 @@ class HelixPoint(QGraphicsItem):
 
     def get_number(self):
         if self.set_number is None:
-            return self.number
+            return self.get_pure_number()
         else:
             return self.set_number
 
-    def set_pure_number(self, number):
-        self.number = number
-
     def get_pure_number(self):
+        if self.selected:
+            return self.numbering.get_number(self)
         return self.number
 
     def get_ref_point(self):
@@ -146,6 +132,12 @@ class HelixPoint(QGraphicsItem):
         self.set_number = set_number
         self.text.setPlainText("{:d}".format(self.set_number))
 
+    def update_text(self):
+        number = "{:d}".format(self.get_number())
+        if self.text.toPlainText() != number:
+            self.text.setPlainText(number)
+        self.text.setVisible(self.selected)
+
     def get_text(self):
         return self.text
 
@@ -156,13 +148,17 @@ class HelixPoint(QGraphicsItem):
         return self.selected
 
     def set_selection(self, state):
+        renumbered = []
+        if state and not self.selected:
+            self.numbering.add(self)
+        elif not state and self.selected:
+            # a deselected helix keeps its last number, the helices selected after it move down by one
+            self.number = self.numbering.get_number(self)
+            renumbered = self.numbering.remove(self)
         self.selected = state
-
-    def reduce_count(self):
-        self.count -= 1
-
-    def reduce_number(self):
-        self.number -= 1
+        self.update_text()
+        for helix in renumbered:
+            helix.update_text()
 
     def boundingRect(self):
         return QRectF(self.x() - 2*self.radius, self.y() - 2*self.radius, 4*self.radius, 4*self.radius)
@@ -173,7 +169,7 @@ class HelixPoint(QGraphicsItem):
             self.text.setPos(2*self.x() - self.radius, 2*self.y() - self.radius)
             self.text.setTransformOriginPoint(self.radius, self.radius)
             self.text.setZValue(5)
-            self.text.hide()
+            self.text.setVisible(self.selected)
         if self.selected:
             if self.connected:
                 painter.setBrush(QBrush(Qt.GlobalColor.darkBlue))
@@ -181,36 +177,21 @@ class HelixPoint(QGraphicsItem):
                 painter.setBrush(QBrush(Qt.GlobalColor.darkGreen))
             else:
                 painter.setBrush(QBrush(Qt.GlobalColor.green))
-            self.text.show()
         else:
             painter.setBrush(QBrush(Qt.GlobalColor.lightGray))
-            self.text.hide()
         painter.setPen(QPen(Qt.GlobalColor.darkGray))
         painter.drawEllipse(QPointF(self.x(), self.y()), 2*self.radius, 2*self.radius)
 
     def mousePressEvent(self, event):
         if self.editable:
             if self.selected and event.buttons() == Qt.MouseButton.LeftButton:
-                self.selected = False
+                self.set_selection(False)
                 event.accept()
-                for item in self.scene().items():
-                    if isinstance(item, HelixPoint):
-                        item.reduce_count()
-                        if item.get_number() > self.get_number() and not item.has_set_number():
-                            item.reduce_number()
-                            item.get_text().setPlainText("{:d}".format(item.get_number()))
             elif not self.selected and event.buttons() == Qt.MouseButton.LeftButton:
-                self.selected = True
+                self.set_selection(True)
                 event.accept()
-                self.number = self.count
-                if self.set_number is None:
-                    self.text.setPlainText("{:d}".format(self.number))
-                else:
-                    self.text.setPlainText("{:d}".format(self.set_number))
-                for item in self.scene().items():
-                    if isinstance(item, HelixPoint):
-                        item.increment_count()
             self.update()
+            self.window.store_cs_helices()
         elif self.renumbering:
             if self.selected and event.buttons() == Qt.MouseButton.LeftButton:
                 event.accept()
@@ -221,3 +202,109 @@ class HelixPoint(QGraphicsItem):
             return self.connected
         else:
             self.connected = state
+
+
+class LatticeItem(QGraphicsItem):
+    # unselected lattice positions are only painted, a HelixPoint is created once a position is clicked
+
+    def __init__(self, ref_point, lattice_type, columns, rows, window, parent=None):
+        super().__init__(parent)
+        self.ref_point = ref_point
+        self.lattice_type = lattice_type
+        self.columns = columns
+        self.rows = rows
+        self.window = window
+        self.editable = False
+        self.helices = {}
+        self.numbering = HelixNumbering()
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemUsesExtendedStyleOption)
+        self.setZValue(-1)
+
+    def get_helices(self):
+        return self.helices
+
+    def enable_editing(self):
+        self.editable = True
+
+    def disable_editing(self):
+        self.editable = False
+
+    def get_radius(self):
+        return (self.window.get_parameters()['hd'] * 10) / 2
+
+    def get_spacing(self):
+        rd = (self.window.get_parameters()['hd'] * 10) / 2 + (self.window.get_parameters()['ihg'] * 10) / 2
+        if self.lattice_type == 1:
+            return 2 * np.sqrt(3) * rd, 1.5 * rd
+        else:
+            return 2 * rd, 2 * rd
+
+    def recalc(self):
+        # the materialized helices are placed from one array expression over their lattice indices
+        self.prepareGeometryChange()
+        if self.helices:
+            x_ind, y_ind = np.array(list(self.helices), dtype=int).T
+            positions = CrossSection.lattice_positions(self.lattice_type, x_ind, y_ind, self.window.get_parameters())
+            for helix, (x_pos, y_pos) in zip(self.helices.values(), positions.tolist()):
+                helix.prepareGeometryChange()
+                helix.update_radius()
+                helix.set_lattice_pos(x_pos, y_pos)
+        self.update()
+
+    def materialize(self, x_ind, y_ind):
+        if (x_ind, y_ind) not in self.helices:
+            helix = HelixPoint(self.ref_point, x_ind, y_ind, self.window, self.lattice_type, self.numbering)
+            if self.editable:
+                helix.enable_editing()
+            self.scene().addItem(helix)
+            self.helices[(x_ind, y_ind)] = helix
+        return self.helices[(x_ind, y_ind)]
+
+    def index_range(self, low, high, spacing, count):
+        return np.arange(max(int(np.floor(low / spacing)) - 2, 0), min(int(np.ceil(high / spacing)) + 3, count))
+
+    def positions_in(self, rect):
+        # rect is in lattice coordinates, which are half of the scene coordinates
+        x_spacing, y_spacing = self.get_spacing()
+        x_ind, y_ind = np.meshgrid(self.index_range(rect.left(), rect.right(), x_spacing, self.columns),
+                                   self.index_range(rect.top(), rect.bottom(), y_spacing, self.rows))
+        x_ind = x_ind.ravel()
+        y_ind = y_ind.ravel()
+        return x_ind, y_ind, CrossSection.lattice_positions(self.lattice_type, x_ind, y_ind,
+                                                            self.window.get_parameters())
+
+    def index_at(self, x, y):
+        radius = self.get_radius()
+        x_ind, y_ind, positions = self.positions_in(QRectF(x - radius, y - radius, 2 * radius, 2 * radius))
+        if len(positions) == 0:
+            return None
+        distances = np.hypot(positions[:, 0] - x, positions[:, 1] - y)
+        closest = np.argmin(distances)
+        if distances[closest] > radius:
+            return None
+        return int(x_ind[closest]), int(y_ind[closest])
+
+    def boundingRect(self):
+        radius = self.get_radius()
+        x_spacing, y_spacing = self.get_spacing()
+        return QRectF(-2 * radius, -2 * radius, 2 * x_spacing * self.columns + 4 * radius,
+                      2 * y_spacing * self.rows + 4 * radius)
+
+    def paint(self, painter, option, widget=...):
+        radius = self.get_radius()
+        rect = option.exposedRect if isinstance(option, QStyleOptionGraphicsItem) else self.boundingRect()
+        x_ind, y_ind, positions = self.positions_in(QRectF(rect.left() / 2 - radius, rect.top() / 2 - radius,
+                                                           rect.width() / 2 + 2 * radius,
+                                                           rect.height() / 2 + 2 * radius))
+        painter.setBrush(QBrush(Qt.GlobalColor.lightGray))
+        painter.setPen(QPen(Qt.GlobalColor.darkGray))
+        for x, y in positions.tolist():
+            painter.drawEllipse(QPointF(2 * x, 2 * y), 2 * radius, 2 * radius)
+
+    def mousePressEvent(self, event):
+        if self.editable and event.buttons() == Qt.MouseButton.LeftButton:
+            index = self.index_at(event.pos().x() / 2, event.pos().y() / 2)
+            if index is not None:
+                self.materialize(*index).mousePressEvent(event)
+                return
+        event.ignore()
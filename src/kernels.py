@@ -0,0 +1,151 @@
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+def create_kernels(jit):
+    # the same source runs as plain NumPy or compiled with Numba, so the two can be compared against each other
+
+    @jit
+    def rotation_matrix_around_axis(A, theta):
+        R = np.empty((3, 3))
+        R[0, 0] = A[0] * A[0] * (1 - np.cos(theta)) + np.cos(theta)
+        R[0, 1] = A[0] * A[1] * (1 - np.cos(theta)) - A[2] * np.sin(theta)
+        R[0, 2] = A[0] * A[2] * (1 - np.cos(theta)) + A[1] * np.sin(theta)
+        R[1, 0] = A[0] * A[1] * (1 - np.cos(theta)) + A[2] * np.sin(theta)
+        R[1, 1] = A[1] * A[1] * (1 - np.cos(theta)) + np.cos(theta)
+        R[1, 2] = A[1] * A[2] * (1 - np.cos(theta)) - A[0] * np.sin(theta)
+        R[2, 0] = A[0] * A[2] * (1 - np.cos(theta)) - A[1] * np.sin(theta)
+        R[2, 1] = A[1] * A[2] * (1 - np.cos(theta)) + A[0] * np.sin(theta)
+        R[2, 2] = A[2] * A[2] * (1 - np.cos(theta)) + np.cos(theta)
+        return R
+
+    @jit
+    def solve_xy_basis(T_ij, T_base, N_base, B_base):
+        c = np.cross(T_base, T_ij)
+        d = np.dot(T_base, T_ij)
+        if c[0] != 0 or c[1] != 0 or c[2] != 0:
+            Z = np.zeros((3, 3))
+            Z[0, 1] = -c[2]
+            Z[0, 2] = c[1]
+            Z[1, 0] = c[2]
+            Z[1, 2] = -c[0]
+            Z[2, 0] = -c[1]
+            Z[2, 1] = c[0]
+            R = (np.identity(3) + Z + np.dot(Z, Z) * (1 - d) / (np.linalg.norm(c) ** 2)) / (
+                    np.linalg.norm(T_base) ** 2)
+        else:
+            R = np.sign(d) * (np.linalg.norm(T_ij) / np.linalg.norm(T_base)) * np.identity(3)
+        return np.dot(R, N_base), np.dot(R, B_base)
+
+    @jit
+    def refine_plane_rotation(T_ij, N_ij, B_ij, ref_N_ij, ref_B_ij, theta_0, d_lim_0, theta_1, d_lim_1):
+        # bisects between the two best angles of the grid search
+        delta_lim = 0.05
+        delta = 1.0
+        reps = 0
+        while delta >= delta_lim and reps < 50:
+            half_point_theta = (theta_0 + theta_1) / (2 ** (reps + 1))
+            R = rotation_matrix_around_axis(T_ij, half_point_theta)
+            d = np.linalg.norm(np.dot(R, N_ij) - ref_N_ij) + np.linalg.norm(np.dot(R, B_ij) - ref_B_ij)
+            if d < d_lim_0:
+                theta_0 = half_point_theta
+                delta = d_lim_0 - d
+                d_lim_0 = d
+            elif d < d_lim_1:
+                theta_1 = half_point_theta
+                delta = d_lim_1 - d
+                d_lim_1 = d
+            else:
+                reps += 1
+        R = rotation_matrix_around_axis(T_ij, theta_0)
+        return np.dot(R, N_ij), np.dot(R, B_ij)
+
+    @jit
+    def solve_plane_rotation(T_ij, N_ij, B_ij, ref_N_ij, ref_B_ij):
+        d_lim_0 = np.inf
+        d_lim_1 = np.inf
+        theta_0 = np.nan
+        theta_1 = np.nan
+        for n in range(65):
+            start_theta = n * np.pi / 32
+            R = rotation_matrix_around_axis(T_ij, start_theta)
+            d = np.linalg.norm(np.dot(R, N_ij) - ref_N_ij) + np.linalg.norm(np.dot(R, B_ij) - ref_B_ij)
+            if d < d_lim_0:
+                theta_0 = start_theta
+                d_lim_0 = d
+            elif d < d_lim_1:
+                theta_1 = start_theta
+                d_lim_1 = d
+        return refine_plane_rotation(T_ij, N_ij, B_ij, ref_N_ij, ref_B_ij, theta_0, d_lim_0, theta_1, d_lim_1)
+
+    @jit
+    def propagate_frames(tangents, T_base, N_base, B_base, ref_N_ij, ref_B_ij):
+        # each frame is the one closest to the previous frame in the plane normal to its tangent
+        N_ijs = np.empty((tangents.shape[0], 3))
+        B_ijs = np.empty((tangents.shape[0], 3))
+        for k in range(tangents.shape[0]):
+            N_ij, B_ij = solve_xy_basis(tangents[k], T_base, N_base, B_base)
+            ref_N_ij, ref_B_ij = solve_plane_rotation(tangents[k], N_ij, B_ij, ref_N_ij, ref_B_ij)
+            N_ijs[k] = ref_N_ij
+            B_ijs[k] = ref_B_ij
+        return N_ijs, B_ijs
+
+    @jit
+    def mod_walk(l_helix, l_ref, mod_length, cycle):
+        # l_helix holds the helix lengths at the checkpoints visited in an interval, the mod counts of the helices
+        # start from zero in every interval and carry over its checkpoints
+        marks = np.zeros(l_helix.shape)
+        lengths = np.empty(l_helix.shape)
+        for h in range(l_helix.shape[0]):
+            mod_count = 0
+            for v in range(l_helix.shape[1]):
+                length = l_helix[h, v] + mod_count * mod_length
+                lengths[h, v] = length % cycle
+                if length - l_ref[v] >= mod_length:
+                    marks[h, v] = 1
+                    mod_count -= 1
+                elif length - l_ref[v] <= -mod_length:
+                    marks[h, v] = -1
+                    mod_count += 1
+        return marks, lengths
+
+    @jit
+    def twist_pairs(lengths, ranks, alpha, rad_nm, twist_tol, targets):
+        # 1 marks neighbouring helices in phase with their targets, 2 the ones in opposite phase
+        pairs = np.zeros((lengths.shape[0], lengths.shape[0]), dtype=np.int64)
+        for a in range(lengths.shape[0]):
+            for b in range(lengths.shape[0]):
+                target = targets[ranks[a], ranks[b]]
+                if target[0] != 0:
+                    delta_1 = np.abs(lengths[a] * rad_nm + alpha - target[1])
+                    delta_2 = np.abs(lengths[b] * rad_nm + alpha - target[2])
+                    if delta_1 < twist_tol and delta_2 < twist_tol:
+                        pairs[a, b] = 1
+                    elif np.abs(delta_1 - np.pi) < twist_tol and np.abs(delta_2 - np.pi) < twist_tol:
+                        pairs[a, b] = 2
+        return pairs
+
+    return {'rotation_matrix_around_axis': rotation_matrix_around_axis, 'solve_xy_basis': solve_xy_basis,
+            'solve_plane_rotation': solve_plane_rotation, 'refine_plane_rotation': refine_plane_rotation,
+            'propagate_frames': propagate_frames, 'mod_walk': mod_walk, 'twist_pairs': twist_pairs}
+
+
+REFERENCE = create_kernels(lambda function: function)
+COMPILED = {}
+
+
+def has_compiler():
+    return numba is not None
+
+
+def get_kernels(compiled=False):
+    # the compiled kernels are built on first use, without Numba the NumPy kernels are used
+    if not compiled or numba is None:
+        return REFERENCE
+    if not COMPILED:
+        COMPILED.update(create_kernels(numba.njit))
+    return COMPILED
@@ -1,18 +1,23 @@
 import json
+import os
 
 import numpy as np
 
-from PySide6.QtCore import Qt, Slot, QSize
+from PySide6.QtCore import Qt, Slot, QSize, QStandardPaths
 from PySide6.QtGui import QAction, QBrush, QIcon, QTransform, QPixmap
 from PySide6.QtWidgets import (QMainWindow, QToolBar, QErrorMessage, QDockWidget, QStatusBar, QDoubleSpinBox,
                                QGraphicsView, QPushButton, QSpinBox, QFileDialog, QMenuBar, QMenu, QWidget, QGridLayout,
-                               QLabel, QTabWidget)
+                               QLabel, QTabWidget, QCheckBox, QComboBox, QGraphicsScene)
 
 from curvescene import CurveScene
 from curveview import CurveView
 from csview import CSView
-from nodepoint import NodePoint
-from helixpoint import HelixPoint, ReferencePoint
+from crosssection import CrossSection
+from curvecache import DiskCurveCache
+from pathcurve import PathCurve
+from projectfile import ProjectFile
+from helixpoint import HelixPoint, ReferencePoint, LatticeItem
+from computebackend import get_backend_names
 
 import icons_rc
 
@@ -23,7 +28,8 @@ class MainWindow(QMainWindow):
         super().__init__(parent)
 
         self.parameters = {"ihg": 0.5, "hd": 2.0, "ntl": 0.34, "ml": 0.34, "tl": 10.5, "gs": 20, "tt": np.pi / 8,
-                           "zs": 1, "ts": 1, "rs": 1}
+                           "ls": 20, "zs": 1, "ts": 1, "rs": 1, "dc": False, "dcs": 256,
+                           "ec": True, "cb": "reference"}
 
         self.scene = CurveScene(8 * self.parameters['gs'], self.parameters['gs'], parent=self)
         self.scene.setBackgroundBrush(QBrush(Qt.GlobalColor.white))
@@ -416,6 +422,13 @@ class MainWindow(QMainWindow):
 
         menu_bar = QMenuBar(None)
         main_menu = QMenu("AutoMod")
+        open_project = QAction("Open Project", self)
+        open_project.triggered.connect(self.open_project_action)
+        main_menu.addAction(open_project)
+        save_project = QAction("Save Project", self)
+        save_project.triggered.connect(self.save_project_action)
+        main_menu.addAction(save_project)
+        main_menu.addSeparator()
         user_settings = QAction("User Settings", self)
         user_settings.triggered.connect(self.set_settings_action)
         main_menu.addAction(user_settings)
@@ -433,15 +446,13 @@ class MainWindow(QMainWindow):
     @Slot(float)
     def spin_interhelical_gap_action(self, value):
         self.parameters['ihg'] = value
-        for _, node_lst in self.scene.get_storage().get_nodes().items():
-            node_lst[0].redraw_lattice()
+        self.redraw_cs_scene()
         self.scene.get_storage().interpolate()
 
     @Slot(float)
     def spin_helix_diameter_action(self, value):
         self.parameters['hd'] = value
-        for _, node_lst in self.scene.get_storage().get_nodes().items():
-            node_lst[0].redraw_lattice()
+        self.redraw_cs_scene()
         self.scene.get_storage().interpolate()
 
     @Slot(float)
@@ -472,6 +483,22 @@ class MainWindow(QMainWindow):
         self.parameters['tt'] = value
         self.scene.get_storage().interpolate()
 
+    @Slot(int)
+    def spin_lattice_size_action(self, value):
+        self.parameters['ls'] = value
+        if (self.cs_node is not None and self.cs_tool_active()
+                and self.cs_node.get_cross_section().get_lattice_type() is not None):
+            # the lattice on screen is rebuilt from the model at its new size
+            self.cs_node.save_cs_angle(self.cs_view.get_rotation_amount())
+            self.cs_node.save_cs_transform(self.cs_view.transform())
+            self.cs_node.edit_cross_section().set_lattice_size(value)
+            self.activate_cs_tool()
+
+    @Slot(str)
+    def select_compute_backend_action(self, name):
+        self.parameters['cb'] = name
+        self.scene.get_storage().interpolate()
+
     @Slot(float)
     def spin_zoom_value(self, value):
         self.parameters["zs"] = (1 / value)
@@ -484,6 +511,33 @@ class MainWindow(QMainWindow):
     def spin_rotate_value(self, value):
         self.parameters["rs"] = (1 / value)
 
+    @Slot(bool)
+    def toggle_disk_cache_action(self, checked):
+        self.parameters["dc"] = checked
+        self.update_disk_cache()
+
+    @Slot(int)
+    def spin_disk_cache_size_action(self, value):
+        self.parameters["dcs"] = value
+        self.update_disk_cache()
+
+    def update_disk_cache(self):
+        storage = self.scene.get_storage()
+        if not self.parameters["dc"]:
+            storage.set_disk_cache(None)
+        elif storage.get_disk_cache() is None:
+            directory = os.path.join(QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation),
+                                     "curves")
+            try:
+                storage.set_disk_cache(DiskCurveCache(directory, PathCurve.SOLUTION_LAYOUT,
+                                                      self.parameters["dcs"] * 1024 ** 2))
+            except OSError:
+                self.ehandler.showMessage("The disk cache could not be created in {}.".format(directory))
+                self.parameters["dc"] = False
+                self.disk_cache_value.setChecked(False)
+        else:
+            storage.get_disk_cache().set_budget(self.parameters["dcs"] * 1024 ** 2)
+
     def init_settings_window(self):
         self.settings_window.setWindowTitle("User Settings")
         self.settings_window.setMinimumWidth(400)
@@ -501,6 +555,30 @@ class MainWindow(QMainWindow):
         view_control_layout = QGridLayout()
         view_control_page.setLayout(view_control_layout)
         tabs.addTab(view_control_page, "View control")
+        cache_page = QWidget()
+        cache_layout = QGridLayout()
+        cache_page.setLayout(cache_layout)
+        tabs.addTab(cache_page, "Cache")
+
+        self.disk_cache_value = QCheckBox("Keep interpolation results on disk")
+        self.disk_cache_value.setChecked(self.parameters["dc"])
+        self.disk_cache_value.toggled.connect(self.toggle_disk_cache_action)
+        cache_layout.addWidget(self.disk_cache_value, 0, 0)
+
+        cache_layout.addWidget(QLabel("Disk cache size:"), 1, 0)
+        disk_cache_size_value = QSpinBox()
+        disk_cache_size_value.setSuffix(" MB")
+        disk_cache_size_value.setSingleStep(64)
+        disk_cache_size_value.setMinimum(1)
+        disk_cache_size_value.setMaximum(65536)
+        disk_cache_size_value.setValue(self.parameters["dcs"])
+        disk_cache_size_value.valueChanged.connect(self.spin_disk_cache_size_action)
+        cache_layout.addWidget(disk_cache_size_value, 2, 0)
+
+        embed_curves_value = QCheckBox("Embed curve solutions in project files")
+        embed_curves_value.setChecked(self.parameters["ec"])
+        embed_curves_value.toggled.connect(self.toggle_embed_curves_action)
+        cache_layout.addWidget(embed_curves_value, 3, 0)
 
         view_control_layout.addWidget(QLabel("Zoom Sensitivity:"), 0, 0)
         zoom_value = QDoubleSpinBox()
@@ -591,6 +669,60 @@ class MainWindow(QMainWindow):
         twist_tol_value.valueChanged.connect(self.spin_twist_tol_action)
         parameter_layout.addWidget(twist_tol_value, 3, 2)
 
+        parameter_layout.addWidget(QLabel("Lattice size:"), 4, 2)
+        lattice_size_value = QSpinBox()
+        lattice_size_value.setSuffix(" helices")
+        lattice_size_value.setSingleStep(1)
+        lattice_size_value.setMinimum(2)
+        lattice_size_value.setMaximum(500)
+        lattice_size_value.setValue(self.parameters["ls"])
+        lattice_size_value.valueChanged.connect(self.spin_lattice_size_action)
+        parameter_layout.addWidget(lattice_size_value, 5, 2)
+
+        # the compiled backend is only listed with Numba installed
+        parameter_layout.addWidget(QLabel("Compute backend:"), 6, 2)
+        compute_backend_value = QComboBox()
+        compute_backend_value.addItems(get_backend_names())
+        compute_backend_value.setCurrentText(self.parameters["cb"])
+        compute_backend_value.currentTextChanged.connect(self.select_compute_backend_action)
+        parameter_layout.addWidget(compute_backend_value, 7, 2)
+
+    @Slot(bool)
+    def toggle_embed_curves_action(self, checked):
+        self.parameters["ec"] = checked
+
+    @Slot(bool)
+    def save_project_action(self):
+        file_name = QFileDialog.getSaveFileName(self, "", "", "*.amod")
+        if file_name[0]:
+            if self.cs_node is not None and self.cs_tool_active():
+                self.cs_node.save_cs_angle(self.cs_view.get_rotation_amount())
+                self.cs_node.save_cs_transform(self.cs_view.transform())
+            try:
+                ProjectFile(self, self.scene.get_storage()).save(file_name[0], self.parameters["ec"])
+            except OSError as error:
+                self.ehandler.showMessage("Saving the project failed: {}".format(error))
+
+    @Slot(bool)
+    def open_project_action(self):
+        file_name = QFileDialog.getOpenFileName(self, "", "", "*.amod")
+        if file_name[0]:
+            self.remove_point_selection()
+            self.deactivate_cs_tool()
+            self.cs_scene = None
+            self.cs_node = None
+            try:
+                ProjectFile(self, self.scene.get_storage()).load(file_name[0])
+            except (OSError, ValueError, KeyError) as error:
+                self.ehandler.showMessage("Opening the project failed: {}".format(error))
+            self.scene.update_grid_scale()
+            self.scene.get_storage().redraw_grid()
+            self.view.init_fit()
+            self.settings_window.close()
+            self.settings_window = QWidget()
+            self.init_settings_window()
+            self.view.update()
+
     @Slot(bool)
     def set_settings_action(self):
         self.settings_window.show()
@@ -607,20 +739,27 @@ class MainWindow(QMainWindow):
                 else:
                     with open(json_file_name[0], "r", encoding="utf-8") as f:
                         dct = json.load(f)
-                        for helix_number, mod_array in maps[0][0].items():
-                            if not self.write_loops_skips(dct, helix_number, mod_array):
-                                self.ehandler.showMessage("Modification writing was not fully successful. "
-                                                          "Make sure that all helix numbers match.")
-                            if not self.delete_twisted_cos(dct, helix_number, maps[0][1][helix_number]):
-                                self.ehandler.showMessage("Crossover deletion was not fully successful. "
-                                                          "Make sure that all helix numbers match.")
-                            if not self.write_twistless_cos(dct, helix_number, maps[0][1][helix_number]):
-                                self.ehandler.showMessage("Crossover writing was not successful. "
-                                                          "Make sure that all helix numbers match.")
+                        for message in self.write_mod_map(dct, maps[0][0], maps[0][1]):
+                            self.ehandler.showMessage(message)
                     with open(json_file_name[0], "w", encoding="utf-8") as f:
                         json.dump(dct, f)
         self.write_tool.setChecked(False)
 
+    @classmethod
+    def write_mod_map(cls, dct, mods, twists):
+        messages = []
+        for helix_number, mod_array in mods.items():
+            if not cls.write_loops_skips(dct, helix_number, mod_array):
+                messages.append("Modification writing was not fully successful. "
+                                "Make sure that all helix numbers match.")
+            if not cls.delete_twisted_cos(dct, helix_number, twists[helix_number]):
+                messages.append("Crossover deletion was not fully successful. "
+                                "Make sure that all helix numbers match.")
+            if not cls.write_twistless_cos(dct, helix_number, twists[helix_number]):
+                messages.append("Crossover writing was not successful. "
+                                "Make sure that all helix numbers match.")
+        return messages
+
     @staticmethod
     def write_loops_skips(dct, helix_number, mod_array):
         if "vstrands" in dct:
@@ -735,6 +874,7 @@ class MainWindow(QMainWindow):
     def spin_renumber_action(self, value):
         if self.connected_helix is not None:
             self.connected_helix.renumber(value)
+            self.store_cs_helices()
 
     @Slot()
     def copy_cs_action(self):
@@ -746,16 +886,14 @@ class MainWindow(QMainWindow):
         if self.cs_node is not None:
             self.cs_node.save_cs_angle(self.cs_view.get_rotation_amount())
             self.cs_node.save_cs_transform(self.cs_view.transform())
-            self.cs_node.set_ref_point(self.cs_view.get_ref_point())
-            # self.cs_view.set_ref_point(None)
-            self.stored_cs = [self.cs_node.get_cs_scene(), self.cs_view.get_ref_point(),
-                              self.cs_view.get_rotation_amount(), self.cs_view.transform(),
-                              self.cs_node.get_lattice_type()]
+            if self.stored_cs is not None:
+                self.stored_cs.release()
+            self.stored_cs = self.cs_node.get_cross_section().acquire()
 
     @Slot()
     def paste_cs_action(self):
         if self.cs_node is not None and self.stored_cs is not None:
-            self.cs_node.change_scene(self.stored_cs)
+            self.cs_node.set_cross_section(self.stored_cs)
             self.activate_cs_tool()
 
     @Slot(float)
@@ -765,6 +903,7 @@ class MainWindow(QMainWindow):
             if np.abs(delta) >= 0.01:
                 self.cs_view.get_ref_point().setPos(self.cs_view.get_ref_point().x() + delta,
                                                     self.cs_view.get_ref_point().y())
+                self.store_cs_ref_point()
 
     @Slot(float)
     def ref_point_y_spin_translate_action(self, dy):
@@ -773,6 +912,7 @@ class MainWindow(QMainWindow):
             if np.abs(delta) >= 0.01:
                 self.cs_view.get_ref_point().setPos(self.cs_view.get_ref_point().x(),
                                                     self.cs_view.get_ref_point().y() + delta)
+                self.store_cs_ref_point()
 
     @Slot(float)
     def spin_rotate_lattice_action(self, theta):
@@ -838,51 +978,84 @@ class MainWindow(QMainWindow):
         else:
             self.cs_view.deactivate_rotate()
 
+    def create_lattice(self, cs_scene, lattice_type, n):
+        rd = (self.parameters['hd'] * 10) / 2 + (self.parameters['ihg'] * 10) / 2
+        if lattice_type == 1:
+            dx = np.sqrt(3) * rd
+            cs_scene.setSceneRect(0, 0, 2 * ((n - 1) * 2 * dx), 4 * ((n - 1) * rd + ((n - 1) // 2) * rd))
+            ref_point = ReferencePoint(((n - 1) * 2 * dx) / 2, (n - 1) * rd + ((n - 1) // 2) * rd, 2)
+            rows = 2 * n
+        else:
+            cs_scene.setSceneRect(0, 0, 2 * (rd + (n - 1) * 2 * rd), 2 * (rd + (n - 1) * 2 * rd) + 6 * rd)
+            ref_point = ReferencePoint((rd + rd + (n - 1) * 2 * rd) / 2, (rd + rd + (n - 1) * 2 * rd) / 2, 2)
+            rows = n
+        cs_scene.addItem(ref_point)
+        ref_point.setZValue(10)
+        lattice = LatticeItem(ref_point, lattice_type, n, rows, self)
+        cs_scene.addItem(lattice)
+        return ref_point, lattice
+
+    def create_cs_scene(self, cross_section):
+        cs_scene = QGraphicsScene()
+        cs_scene.setBackgroundBrush(QBrush(Qt.GlobalColor.white))
+        ref_point = None
+        if cross_section.get_lattice_type() is not None:
+            ref_point, lattice = self.create_lattice(cs_scene, cross_section.get_lattice_type(),
+                                                     cross_section.get_lattice_size(self.parameters['ls']))
+            if cross_section.get_ref_pos() is not None:
+                ref_point.setPos(*cross_section.get_ref_pos())
+            for x_ind, y_ind, _, set_number in cross_section.get_helices().tolist():
+                helix = lattice.materialize(x_ind, y_ind)
+                helix.set_selection(True)
+                if set_number >= 0:
+                    helix.renumber(set_number)
+        return cs_scene, ref_point
+
+    def redraw_cs_scene(self):
+        if self.cs_scene is not None:
+            for item in self.cs_scene.items():
+                if isinstance(item, LatticeItem):
+                    item.recalc()
+
+    def store_cs_helices(self):
+        if self.cs_node is not None and self.cs_scene is not None:
+            helices = []
+            for item in self.cs_scene.items():
+                if isinstance(item, HelixPoint) and item.has_selection():
+                    set_number = item.get_number() if item.has_set_number() else -1
+                    helices.append((item.get_x_ind(), item.get_y_ind(), item.get_pure_number(), set_number))
+            if not self.cs_node.get_cross_section().has_helices(helices):
+                self.cs_node.edit_cross_section().set_helices(helices)
+
+    def store_cs_ref_point(self):
+        if self.cs_node is not None and self.cs_view.get_ref_point() is not None:
+            ref_point = self.cs_view.get_ref_point()
+            if (ref_point.x(), ref_point.y()) != self.cs_node.get_cross_section().get_ref_pos():
+                self.cs_node.edit_cross_section().set_ref_pos((ref_point.x(), ref_point.y()))
+
+    def draw_lattice(self, lattice_type):
+        self.cs_view.set_ref_point(None)
+        self.cs_scene.clear()
+        self.cs_angle.setValue(0)
+        self.cs_view.setTransform(QTransform())
+        ref_point, lattice = self.create_lattice(self.cs_scene, lattice_type, self.parameters['ls'])
+        self.cs_node.set_cross_section(CrossSection(lattice_type, (ref_point.x(), ref_point.y()),
+                                                    lattice_size=self.parameters['ls']))
+        self.cs_view.set_ref_point(ref_point)
+        self.ref_point_x_value.setValue(ref_point.x())
+        self.ref_point_y_value.setValue(ref_point.y())
+        self.cs_view.centerOn(2 * ref_point.x(), 2 * ref_point.y())
+
     @Slot(bool)
     def draw_hc_action(self, checked):
         if checked:
-            self.cs_scene.clear()
-            self.cs_angle.setValue(0)
-            self.cs_view.setTransform(QTransform())
-            rd = (self.parameters['hd'] * 10) / 2 + (self.parameters['ihg'] * 10) / 2
-            n = 20
-            dx = np.sqrt(3) * rd
-            self.cs_scene.setSceneRect(0, 0, 2 * ((n - 1) * 2 * dx), 4 * ((n - 1) * rd + ((n - 1) // 2) * rd))
-            ref_point = ReferencePoint(((n - 1) * 2 * dx) / 2, (n - 1) * rd + ((n - 1) // 2) * rd, 2)
-            self.cs_scene.addItem(ref_point)
-            self.cs_node.set_ref_point(ref_point)
-            self.cs_node.set_lattice_type(1)
-            ref_point.setZValue(10)
-            self.cs_view.set_ref_point(ref_point)
-            self.ref_point_x_value.setValue(ref_point.x())
-            self.ref_point_y_value.setValue(ref_point.y())
-            for i in range(2 * n):
-                for j in range(n):
-                    self.cs_scene.addItem(HelixPoint(self.cs_node.get_ref_point(), j, i, self, 1))
-            self.cs_view.centerOn(2 * ref_point.x(), 2 * ref_point.y())
+            self.draw_lattice(1)
             self.draw_hc.setChecked(False)
 
     @Slot(bool)
     def draw_sq_action(self, checked):
         if checked:
-            self.cs_scene.clear()
-            self.cs_angle.setValue(0)
-            self.cs_view.setTransform(QTransform())
-            rd = (self.parameters['hd'] * 10) / 2 + (self.parameters["ihg"] * 10) / 2
-            n = 20
-            self.cs_scene.setSceneRect(0, 0, 2 * (rd + (n - 1) * 2 * rd), 2 * (rd + (n - 1) * 2 * rd) + 6 * rd)
-            ref_point = ReferencePoint((rd + rd + (n - 1) * 2 * rd) / 2, (rd + rd + (n - 1) * 2 * rd) / 2, 2)
-            self.cs_scene.addItem(ref_point)
-            self.cs_node.set_ref_point(ref_point)
-            self.cs_node.set_lattice_type(2)
-            ref_point.setZValue(10)
-            self.cs_view.set_ref_point(ref_point)
-            self.ref_point_x_value.setValue(ref_point.x())
-            self.ref_point_y_value.setValue(ref_point.y())
-            for i in range(n):
-                for j in range(n):
-                    self.cs_scene.addItem(HelixPoint(self.cs_node.get_ref_point(), j, i, self, 2))
-            self.cs_view.centerOn(2 * ref_point.x(), 2 * ref_point.y())
+            self.draw_lattice(2)
             self.draw_sq.setChecked(False)
 
     @Slot(bool)
@@ -1154,16 +1327,22 @@ class MainWindow(QMainWindow):
         self.connection_tools.setVisible(True)
 
     def activate_cs_tool(self):
-        for item in self.scene.items():
-            if isinstance(item, NodePoint) and item.has_selection():
-                self.cs_scene = item.get_cs_scene()
-                self.cs_node = item
+        node_point = self.scene.get_storage().get_selected_node()
+        if node_point is not None:
+            self.cs_node = node_point
+        # only the node shown in the cross section tool gets a scene, built from its cross section model
+        self.disconnect_from_renumber()
+        self.cs_scene, ref_point = self.create_cs_scene(self.cs_node.get_cross_section())
+        self.cs_view.set_ref_point(ref_point)
         self.cs_view.setScene(self.cs_scene)
-        if self.cs_node.get_ref_point() is not None:
-            self.ref_point_x_value.setValue(self.cs_node.get_ref_point().x())
-            self.ref_point_y_value.setValue(self.cs_node.get_ref_point().y())
-            self.cs_view.set_ref_point(self.cs_node.get_ref_point())
-            self.cs_view.centerOn(2 * self.cs_node.get_ref_point().x(), 2 * self.cs_node.get_ref_point().y())
+        if self.add_remove_helices.isChecked():
+            self.cs_view.enable_helix_editing()
+        if self.renumber.isChecked():
+            self.cs_view.enable_helix_renumbering()
+        if ref_point is not None:
+            self.ref_point_x_value.setValue(ref_point.x())
+            self.ref_point_y_value.setValue(ref_point.y())
+            self.cs_view.centerOn(2 * ref_point.x(), 2 * ref_point.y())
         else:
             self.ref_point_x_value.setValue(0)
             self.ref_point_y_value.setValue(0)
@@ -1215,6 +1394,7 @@ class MainWindow(QMainWindow):
     def update_ref_point_value(self, x, y):
         self.ref_point_x_value.setValue(x)
         self.ref_point_y_value.setValue(y)
+        self.store_cs_ref_point()
 
     def update_cs_angle(self, theta):
         self.cs_angle.setValue(self.cs_angle.value() - theta)
@@ -1226,9 +1406,9 @@ class MainWindow(QMainWindow):
         return self.cs_view
 
     def remove_point_selection(self):
-        for item in self.scene.items():
-            if isinstance(item, NodePoint) and item.has_selection():
-                item.set_selection(False)
+        node_point = self.scene.get_storage().get_selected_node()
+        if node_point is not None:
+            node_point.set_selection(False)
 
     def get_tool_widths(self):
         return self.connection_tools.width(), self.point_tools.width(), self.cs_tool.width(), self.cs_toolbar.width()
@@ -0,0 +1,12 @@
+class NodeRecord:
+    __slots__ = ('node_point', 'prev_index', 'next_index', 'projection_index')
+
+    def __init__(self, node_point):
+        self.node_point = node_point
+        self.prev_index = None
+        self.next_index = None
+        self.projection_index = node_point.get_projection_index()
+
+    def get_def_pos(self):
+        # the node point keeps the position, so the record cannot drift from the scene item
+        return self.node_point.get_def_pos()
@@ -1,43 +1,111 @@
+import hashlib
+
 import numpy as np
-from scipy import integrate
 
 from PySide6.QtWidgets import QGraphicsItem
 from PySide6.QtGui import QPainterPath, QPen, QFont, QBrush
 from PySide6.QtCore import Qt, QPointF, QRectF
 
-from helixpoint import HelixPoint
+from computebackend import get_backend
 
 
 class PathCurve(QGraphicsItem):
     PAINTING_POINTS: int = 200
+    SOLUTION_LAYOUT: int = 2
 
-    def __init__(self, start, stop, R, scene, parent=None):
+    def __init__(self, start, stop, scene, parent=None):
         super().__init__(parent)
         self.start = start
         self.stop = stop
         self.scene = scene
+        self.projection = self.scene.get_storage().get_projection()
+
+        self.translation = np.zeros((3, 1))
+        self.projected = None
+        self.projected_version = None
 
+        self.key = self.solution_key()
+        solution = self.scene.get_storage().get_curve_solution(self.key)
+        if solution is None:
+            solution = self.solve()
+            self.scene.get_storage().put_curve_solution(self.key, solution)
+        self.set_solution(solution)
+
+    def solve(self):
+        self.backend = get_backend(self.scene.parent().get_parameters()['cb'])
         t, x, y, z = self.construct_knots()
-        P_x = self.solve_splines(t, x)
-        P_y = self.solve_splines(t, y)
-        P_z = self.solve_splines(t, z)
+        P_x = self.backend.solve_splines(t, x)
+        P_y = self.backend.solve_splines(t, y)
+        P_z = self.backend.solve_splines(t, z)
 
-        self.R = R
-        self.translation = np.zeros((3, 1))
         self.helix_knots = {}
-
         self.painting_points, self.T_ijs, self.N_ijs, self.B_ijs = self.solve_painting_points(P_x, P_y, P_z, t)
         self.helix_curves = self.construct_helix_curves()
-        self.construct_helix_splines(t, P_x, P_y, P_z)
+        self.helix_coefficients = self.construct_helix_splines(t, P_x, P_y, P_z)
         self.target_angles = self.solve_target_angles()
         self.helix_painting_points, self.mod_maps, self.twist_maps = self.solve_mods(P_x, P_y, P_z, t)
+        return {'splines': (t, P_x, P_y, P_z), 'painting_points': self.painting_points, 'T_ijs': self.T_ijs,
+                'N_ijs': self.N_ijs, 'B_ijs': self.B_ijs, 'helix_curves': self.helix_curves,
+                'helix_coefficients': self.helix_coefficients, 'helix_knots': self.helix_knots,
+                'target_angles': self.target_angles, 'helix_painting_points': self.helix_painting_points,
+                'mod_maps': self.mod_maps, 'twist_maps': self.twist_maps}
+
+    def set_solution(self, solution):
+        # solutions are shared through the curve cache and must not be modified in place
+        self.splines = solution['splines']
+        self.painting_points = solution['painting_points']
+        self.T_ijs = solution['T_ijs']
+        self.N_ijs = solution['N_ijs']
+        self.B_ijs = solution['B_ijs']
+        self.helix_curves = solution['helix_curves']
+        self.helix_coefficients = solution['helix_coefficients']
+        self.helix_knots = solution['helix_knots']
+        self.target_angles = solution['target_angles']
+        self.helix_painting_points = solution['helix_painting_points']
+        self.mod_maps = solution['mod_maps']
+        self.twist_maps = solution['twist_maps']
+
+    def get_key(self):
+        return self.key
+
+    def get_chain(self):
+        chain = [self.start]
+        current_node = self.start.get_next_node()
+        while current_node is not None and current_node is not self.start:
+            chain.append(current_node)
+            current_node = current_node.get_next_node()
+        return chain, current_node is self.start
+
+    def solution_key(self):
+        parameters = self.scene.parent().get_parameters()
+        digest = hashlib.blake2b(digest_size=20)
+        # cached and embedded solutions with an older layout no longer match
+        digest.update(np.array([self.SOLUTION_LAYOUT]).tobytes())
+        digest.update(np.asarray(self.projection.get_matrix(), dtype=float).tobytes())
+        digest.update(np.array([parameters[name] for name in ('hd', 'ihg', 'ntl', 'ml', 'tl', 'tt')],
+                               dtype=float).tobytes())
+        chain, closed = self.get_chain()
+        digest.update(b'closed' if closed else b'open')
+        # the backends agree on the modifications but may round differently
+        digest.update(get_backend(parameters['cb']).get_name().encode())
+        for node_point in chain:
+            digest.update(np.asarray(node_point.get_pos_3d(), dtype=float).tobytes())
+            cross_section = node_point.get_cross_section()
+            ref_pos = cross_section.get_ref_pos()
+            if ref_pos is None:
+                digest.update(b'no ref')
+            else:
+                digest.update(np.array(ref_pos, dtype=float).tobytes())
+            digest.update(np.array([cross_section.get_angle()], dtype=float).tobytes())
+            helices = sorted((number, x, y) for number, (x, y)
+                             in cross_section.get_helix_positions(parameters).items())
+            digest.update(np.array(helices, dtype=float).reshape(-1, 3).tobytes())
+            digest.update(b'|')
+        return digest.hexdigest()
 
     def solve_target_angles(self):
         target_angles = []
-        selected_helices = {}
-        for item in self.start.get_cs_scene().items():
-            if isinstance(item, HelixPoint) and item.has_selection():
-                selected_helices[item.get_number()] = item
+        selected_helices = self.start.get_cross_section().get_helix_positions(self.scene.parent().get_parameters())
         for helix_1 in sorted(selected_helices):
             new_row = []
             for helix_2 in sorted(selected_helices):
@@ -45,11 +113,11 @@ class PathCurve(QGraphicsItem):
                 target_h1 = 0
                 target_h2 = 0
                 d_lim = self.scene.parent().get_parameters()['hd'] + self.scene.parent().get_parameters()['ihg']
-                d_12 = (np.sqrt((selected_helices[helix_1].x() - selected_helices[helix_2].x()) ** 2 + (selected_helices[helix_1].y() - selected_helices[helix_2].y()) ** 2)) / 10
+                d_12 = (np.sqrt((selected_helices[helix_1][0] - selected_helices[helix_2][0]) ** 2 + (selected_helices[helix_1][1] - selected_helices[helix_2][1]) ** 2)) / 10
                 if d_12 <= d_lim + 0.2 and helix_1 != helix_2:
                     neighbours = True
-                    r_1 = np.array([selected_helices[helix_1].x(), selected_helices[helix_1].y()])
-                    r_2 = np.array([selected_helices[helix_2].x(), selected_helices[helix_2].y()])
+                    r_1 = np.array([selected_helices[helix_1][0], selected_helices[helix_1][1]])
+                    r_2 = np.array([selected_helices[helix_2][0], selected_helices[helix_2][1]])
                     r_12 = -r_1 + r_2
                     if helix_1 % 2 == 0:
                         target_h1 = np.abs(np.arccos(np.dot(np.array([1, 0]), r_12) / np.linalg.norm(r_12)))
@@ -85,169 +153,139 @@ class PathCurve(QGraphicsItem):
         return self.twist_maps
 
     def construct_helix_splines(self, t, P_x, P_y, P_z):
+        # a helix spline spans the consecutive intervals containing the helix, its coefficients are stored
+        # per interval in the row order of the interval table
+        rows = [dict(zip(table[:, 0].astype(int).tolist(), range(len(table)))) for table, _ in self.helix_curves]
+        coefficients = [np.zeros((len(table), 3, 5)) for table, _ in self.helix_curves]
+        solved = [np.zeros(len(table), dtype=bool) for table, _ in self.helix_curves]
+        knot_positions, knot_tangents = self.solve_knot_tangents(t, P_x, P_y, P_z)
+        frames = {}
         i = 1
-        for interval in self.helix_curves:
-            for helix, details in interval[0].items():
-                if len(details) == 4:
-                    th = [(t[i - 1], details[0], details[2]), (t[i], details[1], details[3])]
+        for table, _ in self.helix_curves:
+            for helix, row in rows[i - 1].items():
+                if not solved[i - 1][row]:
+                    th = [(i - 1, table[row, 1], table[row, 3]), (i, table[row, 2], table[row, 4])]
                     th_t = [t[i - 1], t[i]]
                     j = i
-                    end = False
-                    while not end:
-                        try:
-                            if helix in self.helix_curves[j][0]:
-                                th.append((t[j + 1], self.helix_curves[j][0][helix][1], self.helix_curves[j][0][helix][3]))
-                                th_t.append(t[j + 1])
-                                j += 1
-                            else:
-                                end = True
-                        except IndexError:
-                            end = True
-                    xh, yh, zh = self.construct_helix_knots(th, t, P_x, P_y, P_z)
+                    while j < len(self.helix_curves) and helix in rows[j]:
+                        th.append((j + 1, self.helix_curves[j][0][rows[j][helix], 2],
+                                   self.helix_curves[j][0][rows[j][helix], 4]))
+                        th_t.append(t[j + 1])
+                        j += 1
+                    N_ijs, B_ijs = self.solve_knot_frames(frames, knot_tangents, i - 1, j)
+                    xh, yh, zh = self.construct_helix_knots(th, knot_positions, N_ijs, B_ijs)
                     self.helix_knots[helix] = [xh, yh, zh]
-                    P_xh = self.solve_splines(th_t, xh)
-                    P_yh = self.solve_splines(th_t, yh)
-                    P_zh = self.solve_splines(th_t, zh)
+                    P_xh = self.backend.solve_splines(th_t, xh)
+                    P_yh = self.backend.solve_splines(th_t, yh)
+                    P_zh = self.backend.solve_splines(th_t, zh)
                     for k in range(i - 1, j):
-                        self.helix_curves[k][0][helix].append(P_xh[:, k - (i - 1)])
-                        self.helix_curves[k][0][helix].append(P_yh[:, k - (i - 1)])
-                        self.helix_curves[k][0][helix].append(P_zh[:, k - (i - 1)])
+                        coefficients[k][rows[k][helix]] = (P_xh[:, k - (i - 1)], P_yh[:, k - (i - 1)],
+                                                           P_zh[:, k - (i - 1)])
+                        solved[k][rows[k][helix]] = True
             i += 1
+        return coefficients
 
-    def construct_helix_knots(self, th, t, P_x, P_y, P_z):
-        xh = []
-        yh = []
-        zh = []
-        ref_N_ij = None
-        ref_B_ij = None
-        for k in range(len(th)):
-            for i in range(len(t)):
-                if th[k][0] == t[i]:
-                    if i == 0 or i == 1:
-                        j = 0
-                    else:
-                        j = i - 1
-                    S_ij = np.array(
-                            [P_x[0, j] + P_x[1, j] * (t[i] - P_x[4, j]) + P_x[2, j] * (t[i] - P_x[4, j]) ** 2 + P_x[
-                                3, j] * (t[i] - P_x[4, j]) ** 3,
-                             P_y[0, j] + P_y[1, j] * (t[i] - P_y[4, j]) + P_y[2, j] * (t[i] - P_y[4, j]) ** 2 + P_y[
-                                 3, j] * (t[i] - P_y[4, j]) ** 3,
-                             P_z[0, j] + P_z[1, j] * (t[i] - P_z[4, j]) + P_z[2, j] * (t[i] - P_z[4, j]) ** 2 + P_z[
-                                 3, j] * (t[i] - P_z[4, j]) ** 3])
-                    S_dt_ij = np.array(
-                            [P_x[1, j] + 2 * P_x[2, j] * (t[i] - P_x[4, j]) + 3 * P_x[3, j] * (t[i] - P_x[4, j]) ** 2,
-                             P_y[1, j] + 2 * P_y[2, j] * (t[i] - P_y[4, j]) + 3 * P_y[3, j] * (t[i] - P_y[4, j]) ** 2,
-                             P_z[1, j] + 2 * P_z[2, j] * (t[i] - P_z[4, j]) + 3 * P_z[3, j] * (t[i] - P_z[4, j]) ** 2])
-                    T_ij = S_dt_ij
-                    if np.linalg.norm(T_ij) != 0:
-                        T_ij = (1 / np.linalg.norm(T_ij)) * T_ij
-                    if ref_N_ij is None:
-                        x = self.scene.get_storage().get_unit_x()
-                        y = self.scene.get_storage().get_unit_y()
-                        z = self.scene.get_storage().get_unit_z()
-                        unit_vecs = [[x, y, z, -x, -y, -z], [y, x, x, -y, -x, x], [z, z, -y, z, z, y]]
-                        dots = [np.dot(T_ij, x), np.dot(T_ij, y), np.dot(T_ij, z),
-                                np.dot(T_ij, -x), np.dot(T_ij, -y), np.dot(T_ij, -z)]
-                        T_base = unit_vecs[0][dots.index(max(dots))]
-                        N_base = unit_vecs[1][dots.index(max(dots))]
-                        B_base = unit_vecs[2][dots.index(max(dots))]
-                        N_ij, B_ij = self.solve_xy_basis(T_ij, T_base, N_base, B_base)
-                        if np.dot(N_ij, N_base) < 0:
-                            N_ij = - N_ij
-                        if np.dot(B_ij, B_base) < 0:
-                            B_ij = - B_ij
-                        ref_N_ij, ref_B_ij = self.solve_plane_rotation(T_ij, N_ij, B_ij, N_base, B_base)
-                    else:
-                        N_ij, B_ij = self.solve_xy_basis(T_ij, T_base, N_base, B_base)
-                        N_ij, B_ij = self.solve_plane_rotation(T_ij, N_ij, B_ij, ref_N_ij, ref_B_ij)
-                        ref_N_ij = N_ij
-                        ref_B_ij = B_ij
-                    R = th[k][1] / 10
-                    theta = th[k][2]
-                    h = S_ij + R * np.cos(theta) * N_ij + R * np.sin(theta) * B_ij
-                    xh.append(h[0])
-                    yh.append(h[1])
-                    zh.append(h[2])
-        return xh, yh, zh
-
-    def rotate_projection(self, R):
-        self.R = np.matmul(R, self.R)
+    @staticmethod
+    def solve_knot_tangents(t, P_x, P_y, P_z):
+        # knot k is evaluated at the end of segment k - 1, the first knot at the start of segment 0
+        t_k = np.array(t, dtype=float)
+        j = np.maximum(np.arange(len(t)) - 1, 0)
+        positions = np.zeros((len(t), 3))
+        tangents = np.zeros((len(t), 3))
+        for axis, P in enumerate((P_x, P_y, P_z)):
+            positions[:, axis] = P[0, j] + P[1, j] * (t_k - P[4, j]) + P[2, j] * (t_k - P[4, j]) ** 2 + P[3, j] * (
+                    t_k - P[4, j]) ** 3
+            tangents[:, axis] = P[1, j] + 2 * P[2, j] * (t_k - P[4, j]) + 3 * P[3, j] * (t_k - P[4, j]) ** 2
+        for k in range(len(t)):
+            if np.linalg.norm(tangents[k]) != 0:
+                tangents[k] = (1 / np.linalg.norm(tangents[k])) * tangents[k]
+        return positions, tangents
+
+    def solve_base_frame(self, T_ij):
+        # the first frame of a curve is aligned with the view axis closest to its tangent
+        x = self.scene.get_storage().get_unit_x()
+        y = self.scene.get_storage().get_unit_y()
+        z = self.scene.get_storage().get_unit_z()
+        unit_vecs = [[x, y, z, -x, -y, -z], [y, x, x, -y, -x, x], [z, z, -y, z, z, y]]
+        dots = [np.dot(T_ij, x), np.dot(T_ij, y), np.dot(T_ij, z),
+                np.dot(T_ij, -x), np.dot(T_ij, -y), np.dot(T_ij, -z)]
+        T_base = np.asarray(unit_vecs[0][dots.index(max(dots))], dtype=float)
+        N_base = np.asarray(unit_vecs[1][dots.index(max(dots))], dtype=float)
+        B_base = np.asarray(unit_vecs[2][dots.index(max(dots))], dtype=float)
+        N_ij, B_ij = self.backend.solve_xy_basis(T_ij, T_base, N_base, B_base)
+        if np.dot(N_ij, N_base) < 0:
+            N_ij = - N_ij
+        if np.dot(B_ij, B_base) < 0:
+            B_ij = - B_ij
+        ref_N_ij, ref_B_ij = self.backend.solve_plane_rotation(T_ij, N_ij, B_ij, N_base, B_base)
+        return (T_base, N_base, B_base), N_ij, B_ij, ref_N_ij, ref_B_ij
+
+    def solve_knot_frames(self, frames, tangents, start, stop):
+        # frames are propagated along the knots from the first knot of a helix, so helices starting at the same
+        # knot share them and the table only grows as far as the longest of those helices reaches
+        if start not in frames:
+            bases, N_ij, B_ij, ref_N_ij, ref_B_ij = self.solve_base_frame(tangents[start])
+            frames[start] = (N_ij[np.newaxis, :], B_ij[np.newaxis, :], bases, ref_N_ij, ref_B_ij)
+        N_ijs, B_ijs, bases, ref_N_ij, ref_B_ij = frames[start]
+        if start + len(N_ijs) <= stop:
+            new_N_ijs, new_B_ijs = self.backend.propagate_frames(tangents[start + len(N_ijs):stop + 1], *bases,
+                                                                 ref_N_ij, ref_B_ij)
+            N_ijs = np.concatenate((N_ijs, new_N_ijs))
+            B_ijs = np.concatenate((B_ijs, new_B_ijs))
+            frames[start] = (N_ijs, B_ijs, bases, new_N_ijs[-1], new_B_ijs[-1])
+        return N_ijs[:stop - start + 1], B_ijs[:stop - start + 1]
+
+    @staticmethod
+    def construct_helix_knots(th, knot_positions, N_ijs, B_ijs):
+        # th holds (knot index, R, theta) for consecutive knots, N_ijs and B_ijs start from the first of them
+        knots = np.array([knot for knot, _, _ in th])
+        R = np.array([radius for _, radius, _ in th], dtype=float) / 10
+        theta = np.array([angle for _, _, angle in th], dtype=float)
+        h = (knot_positions[knots] + (R * np.cos(theta))[:, np.newaxis] * N_ijs
+             + (R * np.sin(theta))[:, np.newaxis] * B_ijs)
+        return h[:, 0], h[:, 1], h[:, 2]
 
     def translate(self, dx, dy, dz):
         self.translation = self.translation + np.array([[dx], [dy], [dz]])
+        self.projected = None
+
+    def get_projected_points(self):
+        if self.projected is None or self.projected_version != self.projection.get_version():
+            R = self.projection.get_matrix()
+            knots = {}
+            for helix, knot_lst in self.helix_knots.items():
+                knots[helix] = np.matmul(R, np.array(knot_lst) + self.translation)
+            helix_points = {}
+            for number, array_lst in self.helix_painting_points.items():
+                helix_points[number] = np.matmul(R, array_lst[0] + self.translation)
+            self.projected = (np.matmul(R, self.painting_points + self.translation), knots, helix_points)
+            self.projected_version = self.projection.get_version()
+        return self.projected
 
     def construct_helix_curves(self):
+        # each interval has a table with rows (helix, R_start, R_stop, theta_start, theta_stop) in the helix order
+        # of its stop node, and the cross-section angles of its nodes
         start = self.start
         stop = self.start.get_next_node()
         helix_curves = []
         closed_curve_end = False
+        parameters = self.scene.parent().get_parameters()
         while stop is not None and not closed_curve_end:
-            start_helices = {}
-            helices = {}
-            for item in start.get_cs_scene().items():
-                if isinstance(item, HelixPoint):
-                    if item.has_selection():
-                        start_helices[item.get_number()] = item
-            for item in stop.get_cs_scene().items():
-                if isinstance(item, HelixPoint):
-                    if item.has_selection() and item.get_number() in start_helices:
-                        helices[item.get_number()] = (start_helices[item.get_number()], item)
-            interval_details = {}
-            for number, helix_pair in helices.items():
-                ref_x = start.get_ref_point().x()
-                ref_y = start.get_ref_point().y()
-                x = helix_pair[0].x()
-                y = helix_pair[0].y()
-                R_start = np.sqrt((x - ref_x) ** 2 + (y - ref_y) ** 2)
-                if (x - ref_x) == 0 and (y - ref_y) == 0:
-                    theta_start = 0
-                elif (x - ref_x) == 0:
-                    if y >= ref_y:
-                        theta_start = np.pi / 2
-                    else:
-                        theta_start = - np.pi / 2
-                elif (y - ref_y) == 0:
-                    if x >= ref_x:
-                        theta_start = 0
-                    else:
-                        theta_start = np.pi
-                elif x > ref_x and y < ref_y:
-                    theta_start = - np.arctan(np.abs(y - ref_y) / np.abs(x - ref_x))
-                elif x < ref_x and y < ref_y:
-                    theta_start = - (np.pi - np.arctan(np.abs(y - ref_y) / np.abs(x - ref_x)))
-                elif x < ref_x and y > ref_y:
-                    theta_start = (np.pi - np.arctan(np.abs(y - ref_y) / np.abs(x - ref_x)))
-                else:
-                    theta_start = np.arctan(np.abs(y - ref_y) / np.abs(x - ref_x))
-                ref_x = stop.get_ref_point().x()
-                ref_y = stop.get_ref_point().y()
-                x = helix_pair[1].x()
-                y = helix_pair[1].y()
-                R_stop = np.sqrt((x - ref_x) ** 2 + (y - ref_y) ** 2)
-                if (x - ref_x) == 0 and (y - ref_y) == 0:
-                    theta_stop = 0
-                elif (x - ref_x) == 0:
-                    if y >= ref_y:
-                        theta_stop = np.pi / 2
-                    else:
-                        theta_stop = - np.pi / 2
-                elif (y - ref_y) == 0:
-                    if x >= ref_x:
-                        theta_stop = 0
-                    else:
-                        theta_stop = np.pi
-                elif x > ref_x and y < ref_y:
-                    theta_stop = - np.arctan(np.abs(y - ref_y) / np.abs(x - ref_x))
-                elif x < ref_x and y < ref_y:
-                    theta_stop = - (np.pi - np.arctan(np.abs(y - ref_y) / np.abs(x - ref_x)))
-                elif x < ref_x and y > ref_y:
-                    theta_stop = (np.pi - np.arctan(np.abs(y - ref_y) / np.abs(x - ref_x)))
-                else:
-                    theta_stop = np.arctan(np.abs(y - ref_y) / np.abs(x - ref_x))
-                interval_details[number] = [R_start, R_stop, theta_start + ((start.get_cs_angle() / 360) * 2 * np.pi),
-                                            theta_stop + ((stop.get_cs_angle() / 360) * 2 * np.pi)]
-            helix_curves.append([interval_details, ((start.get_cs_angle() / 360) * 2 * np.pi,
-                                                    (stop.get_cs_angle() / 360) * 2 * np.pi)])
+            start_helices = start.get_cross_section().get_helix_positions(parameters)
+            stop_helices = stop.get_cross_section().get_helix_positions(parameters)
+            numbers = [number for number in stop_helices if number in start_helices]
+            start_offsets = (np.array([start_helices[number] for number in numbers], dtype=float).reshape(-1, 2)
+                             - np.array(start.get_cross_section().get_ref_pos(), dtype=float))
+            stop_offsets = (np.array([stop_helices[number] for number in numbers], dtype=float).reshape(-1, 2)
+                            - np.array(stop.get_cross_section().get_ref_pos(), dtype=float))
+            start_angle = (start.get_cs_angle() / 360) * 2 * np.pi
+            stop_angle = (stop.get_cs_angle() / 360) * 2 * np.pi
+            table = np.column_stack((np.array(numbers, dtype=float),
+                                     np.hypot(start_offsets[:, 0], start_offsets[:, 1]),
+                                     np.hypot(stop_offsets[:, 0], stop_offsets[:, 1]),
+                                     np.arctan2(start_offsets[:, 1], start_offsets[:, 0]) + start_angle,
+                                     np.arctan2(stop_offsets[:, 1], stop_offsets[:, 0]) + stop_angle))
+            helix_curves.append((table, (start_angle, stop_angle)))
             start = stop
             stop = stop.get_next_node()
             if start is self.start:
@@ -255,122 +293,25 @@ class PathCurve(QGraphicsItem):
         return helix_curves
 
     def solve_painting_points(self, P_x, P_y, P_z, t):
-        painting_points = np.zeros((3, (len(t) - 1) * self.PAINTING_POINTS))
-        T_ijs = np.zeros((3, (len(t) - 1) * self.PAINTING_POINTS))
+        t_ps = np.concatenate([t[i] + (np.arange(self.PAINTING_POINTS) / (self.PAINTING_POINTS - 1)) * (t[i + 1] - t[i])
+                               for i in range(len(t) - 1)])
+        segments = np.repeat(np.arange(len(t) - 1), self.PAINTING_POINTS)
+        positions, tangents = self.backend.evaluate(P_x, P_y, P_z, t_ps, segments)
+        painting_points = np.ascontiguousarray(positions.T)
+        T_ijs = np.ascontiguousarray(tangents.T)
         N_ijs = np.zeros((3, (len(t) - 1) * self.PAINTING_POINTS))
         B_ijs = np.zeros((3, (len(t) - 1) * self.PAINTING_POINTS))
-        ref_N_ij = None
-        ref_B_ij = None
-        for i in range(len(t) - 1):
-            for j in range(self.PAINTING_POINTS):
-                t_p = t[i] + (j / (self.PAINTING_POINTS - 1)) * (t[i + 1] - t[i])
-                ind = i * self.PAINTING_POINTS + j
-                painting_points[0, ind] = P_x[0, i] + P_x[1, i] * (t_p - P_x[4, i]) + P_x[2, i] * (
-                        t_p - P_x[4, i]) ** 2 + P_x[3, i] * (t_p - P_x[4, i]) ** 3
-                painting_points[1, ind] = P_y[0, i] + P_y[1, i] * (t_p - P_y[4, i]) + P_y[2, i] * (
-                        t_p - P_y[4, i]) ** 2 + P_y[3, i] * (t_p - P_y[4, i]) ** 3
-                painting_points[2, ind] = P_z[0, i] + P_z[1, i] * (t_p - P_z[4, i]) + P_z[2, i] * (
-                        t_p - P_z[4, i]) ** 2 + P_z[3, i] * (t_p - P_z[4, i]) ** 3
-                S_dt_ij = np.array(
-                    [P_x[1, i] + 2 * P_x[2, i] * (t_p - P_x[4, i]) + 3 * P_x[3, i] * (t_p - P_x[4, i]) ** 2,
-                     P_y[1, i] + 2 * P_y[2, i] * (t_p - P_y[4, i]) + 3 * P_y[3, i] * (t_p - P_y[4, i]) ** 2,
-                     P_z[1, i] + 2 * P_z[2, i] * (t_p - P_z[4, i]) + 3 * P_z[3, i] * (t_p - P_z[4, i]) ** 2])
-                T_ij = S_dt_ij
-                if np.linalg.norm(T_ij) != 0:
-                    T_ij = (1 / np.linalg.norm(T_ij)) * T_ij
-                if ref_N_ij is None:
-                    x = self.scene.get_storage().get_unit_x()
-                    y = self.scene.get_storage().get_unit_y()
-                    z = self.scene.get_storage().get_unit_z()
-                    unit_vecs = [[x, y, z, -x, -y, -z], [y, x, x, -y, -x, x], [z, z, -y, z, z, y]]
-                    dots = [np.dot(T_ij, x), np.dot(T_ij, y), np.dot(T_ij, z),
-                            np.dot(T_ij, -x), np.dot(T_ij, -y), np.dot(T_ij, -z)]
-                    T_base = unit_vecs[0][dots.index(max(dots))]
-                    N_base = unit_vecs[1][dots.index(max(dots))]
-                    B_base = unit_vecs[2][dots.index(max(dots))]
-                    N_ij, B_ij = self.solve_xy_basis(T_ij, T_base, N_base, B_base)
-                    if np.dot(N_ij, N_base) < 0:
-                        N_ij = - N_ij
-                    if np.dot(B_ij, B_base) < 0:
-                        B_ij = - B_ij
-                    ref_N_ij, ref_B_ij = self.solve_plane_rotation(T_ij, N_ij, B_ij, N_base, B_base)
-                else:
-                    N_ij, B_ij = self.solve_xy_basis(T_ij, T_base, N_base, B_base)
-                    N_ij, B_ij = self.solve_plane_rotation(T_ij, N_ij, B_ij, ref_N_ij, ref_B_ij)
-                    ref_N_ij = N_ij
-                    ref_B_ij = B_ij
-                T_ijs[0:3, ind] = T_ij
-                N_ijs[0:3, ind] = N_ij
-                B_ijs[0:3, ind] = B_ij
+        bases, N_ij, B_ij, ref_N_ij, ref_B_ij = self.solve_base_frame(tangents[0])
+        N_ijs[0:3, 0] = N_ij
+        B_ijs[0:3, 0] = B_ij
+        frames = self.backend.propagate_frames(tangents[1:], *bases, ref_N_ij, ref_B_ij)
+        N_ijs[:, 1:] = frames[0].T
+        B_ijs[:, 1:] = frames[1].T
         return painting_points, T_ijs, N_ijs, B_ijs
 
-    @staticmethod
-    def solve_xy_basis(T_ij, T_base, N_base, B_base):
-        c = np.linalg.cross(T_base, T_ij)
-        d = np.dot(T_base, T_ij)
-        if not np.array_equal(c, np.array([0, 0, 0])):
-            Z = np.array([[0, -c[2], c[1]], [c[2], 0, -c[0]], [-c[1], c[0], 0]])
-            R = (np.identity(3) + Z + np.matmul(Z, Z) * (1 - d) / (np.linalg.norm(c) ** 2)) / (
-                    np.linalg.norm(T_base) ** 2)
-        else:
-            R = np.sign(d) * (np.linalg.norm(T_ij) / np.linalg.norm(T_base))
-        return np.matmul(R, N_base), np.matmul(R, B_base)
-
-    def solve_plane_rotation(self, T_ij, N_ij, B_ij, ref_N_ij, ref_B_ij):
-        delta_lim = 0.05
-        d_lims = [None, None]
-        start_thetas = [n * np.pi / 32 for n in range(0, 65)]
-        interval = [None, None]
-        for i in range(len(start_thetas)):
-            R = self.rotation_matrix_around_axis(T_ij, start_thetas[i])
-            d_N = np.linalg.norm(np.matmul(R, N_ij) - ref_N_ij)
-            d_B = np.linalg.norm(np.matmul(R, B_ij) - ref_B_ij)
-            d = d_N + d_B
-            if d_lims[0] is None or d < d_lims[0]:
-                interval[0] = start_thetas[i]
-                d_lims[0] = d
-            elif d_lims[1] is None or d < d_lims[1]:
-                interval[1] = start_thetas[i]
-                d_lims[1] = d
-        delta = 1
-        reps = 0
-        while delta >= delta_lim and reps < 50:
-            half_point_theta = (interval[0] + interval[1]) / (2 ** (reps + 1))
-            R = self.rotation_matrix_around_axis(T_ij, half_point_theta)
-            d_N = np.linalg.norm(np.matmul(R, N_ij) - ref_N_ij)
-            d_B = np.linalg.norm(np.matmul(R, B_ij) - ref_B_ij)
-            d = d_N + d_B
-            if d_lims[0] is None or d < d_lims[0]:
-                interval[0] = half_point_theta
-                delta = d_lims[0] - d
-                d_lims[0] = d
-            elif d_lims[1] is None or d < d_lims[1]:
-                interval[1] = half_point_theta
-                delta = d_lims[1] - d
-                d_lims[1] = d
-            else:
-                reps += 1
-        R = self.rotation_matrix_around_axis(T_ij, interval[0])
-        return np.matmul(R, N_ij), np.matmul(R, B_ij)
-
-    @staticmethod
-    def rotation_matrix_around_axis(A, theta):
-        R = np.array([[A[0] * A[0] * (1 - np.cos(theta)) + np.cos(theta),
-                       A[0] * A[1] * (1 - np.cos(theta)) - A[2] * np.sin(theta),
-                       A[0] * A[2] * (1 - np.cos(theta)) + A[1] * np.sin(theta)],
-                      [A[0] * A[1] * (1 - np.cos(theta)) + A[2] * np.sin(theta),
-                       A[1] * A[1] * (1 - np.cos(theta)) + np.cos(theta),
-                       A[1] * A[2] * (1 - np.cos(theta)) - A[0] * np.sin(theta)],
-                      [A[0] * A[2] * (1 - np.cos(theta)) - A[1] * np.sin(theta),
-                       A[1] * A[2] * (1 - np.cos(theta)) + A[0] * np.sin(theta),
-                       A[2] * A[2] * (1 - np.cos(theta)) + np.cos(theta)]])
-        return R
-
     def solve_mods(self, P_x, P_y, P_z, t):
         mod_maps = {}
         twist_maps = {}
-        mod_counts = {}
-        offset = {}
         all_helices = []
         checkpoints = []
         checkpoint_thetas = []
@@ -383,10 +324,10 @@ class PathCurve(QGraphicsItem):
         theta_sum = 0
         # solve checkpoints, overall cs rotation, and checkpoint rotations
         for interval in self.helix_curves:
-            for helix in sorted(interval[0]):
+            for helix in sorted(interval[0][:, 0].astype(int).tolist()):
                 if helix not in all_helices:
                     all_helices.append(helix)
-            l_ref = integrate.quad(self.gamma_dt_norm, t[i - 1], t[i], args=(P_x, P_y, P_z, t))
+            l_ref = self.backend.arc_lengths(P_x, P_y, P_z, t[i - 1], [t[i]])
             if i > 1:
                 abs_left_offset = nt_length - right_offsets[i - 2]
             else:
@@ -424,8 +365,6 @@ class PathCurve(QGraphicsItem):
                 helix_painting_points[helix] = [np.zeros((3, len(all_checkpoints))),
                                                 np.zeros((1, len(all_checkpoints)))]
                 twist_maps[helix] = [{} for _ in range(n)]
-            mod_counts[helix] = 0
-            offset[helix] = 0
         i = 1
         end = False
         current_checkpoint = all_checkpoints[1]
@@ -433,22 +372,27 @@ class PathCurve(QGraphicsItem):
         mod_jump = 0
         twist_mods = 0
         for interval in self.helix_curves:
+            numbers = interval[0][:, 0].astype(int).tolist()
+            # every helix position visited in this interval lies between the current checkpoint and t[i]
+            first = all_checkpoints.index(current_checkpoint)
+            last = int(np.searchsorted(all_checkpoints, t[i], side='right'))
+            positions = self.helix_gamma(all_checkpoints[first:last], self.helix_coefficients[i - 1])
+            # the twist modifications only depend on the checkpoint rotations, so the checkpoints of the interval
+            # are walked first and the length modifications are solved for all of its visits at once
+            visits = []
             while current_checkpoint <= t[i] and not end:
-                helix_lengths = {}
                 ind = all_checkpoints.index(current_checkpoint) - 1
                 if all_checkpoint_thetas[ind + 1] - twist_mods * (2 * np.pi / turn_length) <= -(2 * np.pi / turn_length):
-                    for helix, details in interval[0].items():
+                    for row, helix in enumerate(numbers):
                         mod_maps[helix][0, ind + mod_jump] = -1
-                        helix_painting_points[helix][0][:, ind + mod_jump] = self.helix_gamma(float(current_checkpoint),
-                                                                                              details[4], details[5],
-                                                                                              details[6])
+                        helix_painting_points[helix][0][:, ind + mod_jump] = positions[row, ind + 1 - first]
                         helix_painting_points[helix][1][0, ind + mod_jump] = -1
                     mod_jump += 1
                     twist_mods -= 1
                 elif all_checkpoint_thetas[ind + 1] - twist_mods * (2 * np.pi / turn_length) >= (2 * np.pi / turn_length):
-                    for helix, details in interval[0].items():
+                    for row, helix in enumerate(numbers):
                         mod_maps[helix][0, ind + mod_jump] = +1
-                        helix_painting_points[helix][0][:, ind + mod_jump] = self.helix_gamma(float(current_checkpoint), details[4], details[5], details[6])
+                        helix_painting_points[helix][0][:, ind + mod_jump] = positions[row, ind + 1 - first]
                         helix_painting_points[helix][1][0, ind + mod_jump] = +1
                     mod_jump -= 1
                     twist_mods += 1
@@ -460,94 +404,59 @@ class PathCurve(QGraphicsItem):
                     else:
                         end = True
                         break
-                for helix, details in interval[0].items():
-                    helix_painting_points[helix][0][:, ind + mod_jump] = self.helix_gamma(float(current_checkpoint), details[4], details[5], details[6])
-                    helix_painting_points[helix][1][0, ind + mod_jump] = 2
-                    l_helix = integrate.quad(self.helix_gamma_dt_norm, t[i - 1], float(current_checkpoint),
-                                             args=(details[4], details[5], details[6]))
-                    l_ref = integrate.quad(self.gamma_dt_norm, t[i - 1], float(current_checkpoint),
-                                           args=(P_x, P_y, P_z, t))
-                    helix_lengths[helix] = (l_helix[0] + mod_counts[helix] * mod_length + offset[helix]) % (turn_length * nt_length)
-                    if (l_helix[0] + mod_counts[helix] * mod_length + offset[helix]) - l_ref[0] >= mod_length:
-                        mod_maps[helix][0, ind + mod_jump] = 1
-                        mod_counts[helix] -= 1
-                        helix_painting_points[helix][1][0, ind + mod_jump] = 1
-                    elif (l_helix[0] + mod_counts[helix] * mod_length + offset[helix]) - l_ref[0] <= -mod_length:
-                        mod_maps[helix][0, ind + mod_jump] = -1
-                        mod_counts[helix] += 1
-                        helix_painting_points[helix][1][0, ind + mod_jump] = -1
-                self.check_twist(helix_lengths, twist_maps, ind + mod_jump, all_checkpoint_thetas[ind])
+                visits.append((ind, ind + mod_jump, float(current_checkpoint)))
                 if all_checkpoints.index(current_checkpoint) + 1 <= len(all_checkpoints) - 1:
                     current_checkpoint = all_checkpoints[int((all_checkpoints.index(current_checkpoint) + 1))]
                 else:
                     end = True
-            for helix, details in interval[0].items():
-                try:
-                    if helix in self.helix_curves[i]:
-                        l_helix = integrate.quad(self.helix_gamma_dt_norm, t[i - 1], t[i],
-                                                 args=(details[4], details[5], details[6]))
-                        l_ref = integrate.quad(self.gamma_dt_norm, t[i - 1], t[i], args=(P_x, P_y, P_z, t))
-                        offset[helix] = (l_helix[0] + mod_counts[helix] * mod_length + offset[helix]) - l_ref[0]
-                        mod_counts[helix] = 0
-                    else:
-                        offset[helix] = 0
-                        mod_counts[helix] = 0
-                except IndexError:
-                    offset[helix] = 0
-                    mod_counts[helix] = 0
+            if visits:
+                # the reference length up to a checkpoint is the same for every helix
+                stops = [checkpoint for _, _, checkpoint in visits]
+                l_ref = self.backend.arc_lengths(P_x, P_y, P_z, t[i - 1], stops)
+                l_helix = self.backend.helix_arc_lengths(self.helix_coefficients[i - 1], t[i - 1], stops)
+                marks, lengths = self.backend.mod_walk(l_helix, l_ref, mod_length, turn_length * nt_length)
+                for v, (ind, column, _) in enumerate(visits):
+                    for row, helix in enumerate(numbers):
+                        helix_painting_points[helix][0][:, column] = positions[row, ind + 1 - first]
+                        helix_painting_points[helix][1][0, column] = 2
+                        if marks[row, v] != 0:
+                            mod_maps[helix][0, column] = marks[row, v]
+                            helix_painting_points[helix][1][0, column] = marks[row, v]
+                    self.check_twist(numbers, lengths[:, v], twist_maps, column, all_checkpoint_thetas[ind])
             i += 1
         return helix_painting_points, mod_maps, twist_maps
 
-    def check_twist(self, helix_lengths, twist_maps, idx, alpha):
+    def check_twist(self, numbers, lengths, twist_maps, idx, alpha):
         twist_tol = self.scene.parent().get_parameters()['tt']
         turn_length = self.scene.parent().get_parameters()['tl']
         nt_length = self.scene.parent().get_parameters()['ntl']
         rad_nm = 2 * np.pi / (turn_length * nt_length)
-        for helix_1, length_1 in helix_lengths.items():
-            for helix_2, length_2 in helix_lengths.items():
-                row = self.target_angles[sorted(helix_lengths).index(helix_1)]
-                element = row[sorted(helix_lengths).index(helix_2)]
-                neighbours = element[0]
-                target_h1 = element[1]
-                target_h2 = element[2]
-                delta_1 = np.abs(length_1 * rad_nm + alpha - target_h1)
-                delta_2 = np.abs(length_2 * rad_nm + alpha - target_h2)
-                if neighbours and delta_1 < twist_tol and delta_2 < twist_tol:
-                    if len(twist_maps[helix_1][idx]) < 1 and len(twist_maps[helix_2][idx]) < 1:
-                        twist_maps[helix_1][idx][helix_2] = (True, False)
-                        twist_maps[helix_2][idx][helix_1] = (True, False)
-                    else:
-                        twist_maps[helix_1][idx] = {}
-                        twist_maps[helix_2][idx] = {}
-                        twist_maps[helix_1][idx][helix_2] = (True, False)
-                        twist_maps[helix_2][idx][helix_1] = (True, False)
-                elif neighbours and np.abs(delta_1 - np.pi) < twist_tol and np.abs(delta_2 - np.pi) < twist_tol:
-                    if len(twist_maps[helix_1][idx]) < 1 and len(twist_maps[helix_2][idx]) < 1:
-                        twist_maps[helix_1][idx][helix_2] = (False, True)
-                        twist_maps[helix_2][idx][helix_1] = (False, True)
-
-    @staticmethod
-    def gamma_dt_norm(t_p, P_x, P_y, P_z, t):
-        for i in range(len(P_x[0, :])):
-            if P_x[4, i] <= t_p <= t[i + 1]:
-                dx = P_x[1, i] + 2 * P_x[2, i] * (t_p - P_x[4, i]) + 3 * P_x[3, i] * (t_p - P_x[4, i]) ** 2
-                dy = P_y[1, i] + 2 * P_y[2, i] * (t_p - P_y[4, i]) + 3 * P_y[3, i] * (t_p - P_y[4, i]) ** 2
-                dz = P_z[1, i] + 2 * P_z[2, i] * (t_p - P_x[4, i]) + 3 * P_z[3, i] * (t_p - P_z[4, i]) ** 2
-                return np.sqrt(dx ** 2 + dy ** 2 + dz ** 2)
-
-    @staticmethod
-    def helix_gamma_dt_norm(t_p, P_xh, P_yh, P_zh):
-        dx = P_xh[1] + 2 * P_xh[2] * (t_p - P_xh[4]) + 3 * P_xh[3] * (t_p - P_xh[4]) ** 2
-        dy = P_yh[1] + 2 * P_yh[2] * (t_p - P_yh[4]) + 3 * P_yh[3] * (t_p - P_yh[4]) ** 2
-        dz = P_zh[1] + 2 * P_zh[2] * (t_p - P_zh[4]) + 3 * P_zh[3] * (t_p - P_zh[4]) ** 2
-        return np.sqrt(dx ** 2 + dy ** 2 + dz ** 2)
+        # the target angles are indexed by the rank of the helix number among the helices of the interval
+        ranks = np.argsort(np.argsort(numbers))
+        targets = np.array(self.target_angles, dtype=float).reshape(len(self.target_angles), len(self.target_angles), 3)
+        pairs = self.backend.twist_pairs(lengths, ranks, alpha, rad_nm, twist_tol, targets)
+        for a, b in zip(*np.nonzero(pairs)):
+            helix_1 = numbers[a]
+            helix_2 = numbers[b]
+            if pairs[a, b] == 1:
+                if len(twist_maps[helix_1][idx]) < 1 and len(twist_maps[helix_2][idx]) < 1:
+                    twist_maps[helix_1][idx][helix_2] = (True, False)
+                    twist_maps[helix_2][idx][helix_1] = (True, False)
+                else:
+                    twist_maps[helix_1][idx] = {}
+                    twist_maps[helix_2][idx] = {}
+                    twist_maps[helix_1][idx][helix_2] = (True, False)
+                    twist_maps[helix_2][idx][helix_1] = (True, False)
+            elif len(twist_maps[helix_1][idx]) < 1 and len(twist_maps[helix_2][idx]) < 1:
+                twist_maps[helix_1][idx][helix_2] = (False, True)
+                twist_maps[helix_2][idx][helix_1] = (False, True)
 
     @staticmethod
-    def helix_gamma(t_p, P_xh, P_yh, P_zh):
-        x = P_xh[0] + P_xh[1] * (t_p - P_xh[4]) + P_xh[2] * (t_p - P_xh[4]) ** 2 + P_xh[3] * (t_p - P_xh[4]) ** 3
-        y = P_yh[0] + P_yh[1] * (t_p - P_yh[4]) + P_yh[2] * (t_p - P_yh[4]) ** 2 + P_yh[3] * (t_p - P_yh[4]) ** 3
-        z = P_zh[0] + P_zh[1] * (t_p - P_zh[4]) + P_zh[2] * (t_p - P_zh[4]) ** 2 + P_zh[3] * (t_p - P_zh[4]) ** 3
-        return np.array([x, y, z])
+    def helix_gamma(t_ps, coefficients):
+        # coefficients is the (H, 3, 5) table of an interval, the result holds every helix at every t_p as (H, C, 3)
+        P = np.asarray(coefficients, dtype=float)[:, np.newaxis, :, :]
+        d = np.asarray(t_ps, dtype=float)[np.newaxis, :, np.newaxis] - P[..., 4]
+        return P[..., 0] + P[..., 1] * d + P[..., 2] * d ** 2 + P[..., 3] * d ** 3
 
     def construct_knots(self):
         t = []
@@ -570,38 +479,8 @@ class PathCurve(QGraphicsItem):
             t.append(i / (len(x) - 1))
         return t, x, y, z
 
-    @staticmethod
-    def solve_splines(x, y):
-        count = len(x)
-        a = np.copy(y)
-        b = np.zeros(count - 1)
-        d = np.zeros(count - 1)
-        h = np.zeros(count - 1)
-        alpha = np.zeros(count - 1)
-        for i in range(0, count - 1):
-            h[i] = x[i + 1] - x[i]
-        for i in range(1, count - 1):
-            alpha[i] = (3 / h[i]) * (a[i + 1] - a[i]) - (3 / h[i - 1]) * (a[i] - a[i - 1])
-        c = np.zeros(count)
-        l = np.zeros(count)
-        l[0] = 1
-        mu = np.zeros(count)
-        z = np.zeros(count)
-        for i in range(1, count - 1):
-            l[i] = 2 * (x[i + 1] - x[i - 1]) - h[i - 1] * mu[i - 1]
-            mu[i] = h[i] / l[i]
-            z[i] = (alpha[i] - h[i - 1] * z[i - 1]) / l[i]
-        l[count - 1] = 1
-        for j in range(count - 2, -1, -1):
-            c[j] = z[j] - mu[j] * c[j + 1]
-            b[j] = (a[j + 1] - a[j]) / h[j] - (h[j] * (c[j + 1] + 2 * c[j])) / 3
-            d[j] = (c[j + 1] - c[j]) / (3 * h[j])
-        return np.stack((a[0:count - 1], b[0:count - 1], c[0:count - 1], d[0:count - 1], x[0:count - 1]))
-
     def boundingRect(self):
-        scene_positions = np.matmul(self.R,
-                                    self.painting_points + np.repeat(self.translation, len(self.painting_points[0, :]),
-                                                                     axis=1))
+        scene_positions = self.get_projected_points()[0]
         return QRectF(QPointF(np.min(scene_positions[0, :]), np.min(scene_positions[2, :])),
                       QPointF(np.max(scene_positions[0, :]), np.max(scene_positions[2, :])))
 
@@ -617,20 +496,17 @@ class PathCurve(QGraphicsItem):
         pen_4.setWidthF(0.1)
         font = QFont()
         font.setPixelSize(1)
-        start_point = np.matmul(self.R, self.painting_points[:, 0] + self.translation[:, 0])
-        path = QPainterPath(QPointF(float(start_point[0]), float(start_point[2])))
-        for i in range(1, len(self.painting_points[0, :])):
-            next_point = np.matmul(self.R, self.painting_points[:, i] + self.translation[:, 0])
-            path.lineTo(float(next_point[0]), float(next_point[2]))
+        scene_positions, scene_knots, scene_helix_points = self.get_projected_points()
+        path = QPainterPath(QPointF(float(scene_positions[0, 0]), float(scene_positions[2, 0])))
+        for i in range(1, len(scene_positions[0, :])):
+            path.lineTo(float(scene_positions[0, i]), float(scene_positions[2, i]))
         painter.setPen(pen_1)
         painter.drawPath(path)
-        for helix, knot_lst in self.helix_knots.items():
-            for i in range(len(knot_lst[0])):
+        for helix, knot_points in scene_knots.items():
+            for i in range(len(knot_points[0, :])):
                 painter.setPen(pen_2)
-                knot = np.array([knot_lst[0][i], knot_lst[1][i], knot_lst[2][i]])
-                knot_point = np.matmul(self.R, knot + self.translation[:, 0])
                 text_path = QPainterPath()
-                text_path.addText(float(knot_point[0]), float(knot_point[2]), font,
+                text_path.addText(float(knot_points[0, i]), float(knot_points[2, i]), font,
                                   "{:d}".format(helix))
                 painter.drawPath(text_path)
                 painter.fillPath(text_path, QBrush(Qt.GlobalColor.black))
@@ -638,7 +514,7 @@ class PathCurve(QGraphicsItem):
             for j in range(len(array_lst[0][0, :])):
                 skip = False
                 if array_lst[1][0, j] != 0:
-                    next_point = np.matmul(self.R, array_lst[0][:, j] + self.translation[:, 0])
+                    next_point = scene_helix_points[number][:, j]
                     if j > 0:
                         if np.array_equal(array_lst[0][:, j], array_lst[0][:, j-1]):
                             skip = True
@@ -0,0 +1,119 @@
+class NodePath:
+
+    def __init__(self, path_id, node_point):
+        self.path_id = path_id
+        self.head = node_point
+        self.tail = node_point
+        self.closed = False
+        self.members = {node_point.get_node_index()}
+
+    def get_head(self):
+        return self.head
+
+    def is_closed(self):
+        return self.closed
+
+    def get_members(self):
+        return self.members
+
+    def get_start(self):
+        # closed paths start from their earliest node, as the scan over Storage3D.nodes used to
+        if self.closed:
+            start_index = min(self.members)
+            node_point = self.head
+            while node_point.get_node_index() != start_index:
+                node_point = node_point.get_next_node()
+            return node_point
+        return self.head
+
+    def get_stop(self):
+        if self.closed:
+            return self.get_start()
+        return self.tail
+
+
+class PathIndex:
+
+    def __init__(self):
+        self.paths = {}
+        self.path_of = {}
+        self.next_id = 0
+
+    def clear(self):
+        self.paths.clear()
+        self.path_of.clear()
+        self.next_id = 0
+
+    def new_path(self, node_point):
+        path = NodePath(self.next_id, node_point)
+        self.paths[self.next_id] = path
+        self.path_of[node_point.get_node_index()] = self.next_id
+        self.next_id += 1
+        return path
+
+    def get_path(self, node_point):
+        return self.paths[self.path_of[node_point.get_node_index()]]
+
+    def get_paths(self):
+        return [path for path in self.paths.values() if len(path.get_members()) >= 2]
+
+    def add_node(self, node_point):
+        self.new_path(node_point)
+
+    def remove_node(self, node_point):
+        path_id = self.path_of.pop(node_point.get_node_index())
+        del self.paths[path_id]
+
+    def link(self, point_1, point_2):
+        path_1 = self.get_path(point_1)
+        path_2 = self.get_path(point_2)
+        if path_1 is path_2:
+            path_1.closed = True
+            path_1.head = point_2
+            path_1.tail = point_1
+            return path_1
+        if len(path_1.members) >= len(path_2.members):
+            larger, smaller = path_1, path_2
+        else:
+            larger, smaller = path_2, path_1
+        for node_index in smaller.members:
+            self.path_of[node_index] = larger.path_id
+        larger.members |= smaller.members
+        larger.head = path_1.head
+        larger.tail = path_2.tail
+        del self.paths[smaller.path_id]
+        return larger
+
+    def unlink(self, point_1, point_2):
+        # called after point_1 and point_2 have been unlinked from each other
+        path = self.get_path(point_1)
+        if path.closed:
+            path.closed = False
+            path.head = point_2
+            path.tail = point_1
+            return path, None
+        # walk both halves in lockstep so that only the shorter one is relabelled
+        left = point_1
+        right = point_2
+        while left.get_prev_node() is not None and right.get_next_node() is not None:
+            left = left.get_prev_node()
+            right = right.get_next_node()
+        backward = left.get_prev_node() is None
+        if backward:
+            split = self.new_path(path.head)
+            split.tail = point_1
+            path.head = point_2
+            node_point = point_1
+        else:
+            split = self.new_path(point_2)
+            split.tail = path.tail
+            path.tail = point_1
+            node_point = point_2
+        split.members.clear()
+        while node_point is not None:
+            node_index = node_point.get_node_index()
+            path.members.discard(node_index)
+            split.members.add(node_index)
+            self.path_of[node_index] = split.path_id
+            node_point = node_point.get_prev_node() if backward else node_point.get_next_node()
+        return path, split
@@ -0,0 +1,138 @@
+import json
+
+import numpy as np
+
+from PySide6.QtGui import QTransform
+
+from crosssection import CrossSection
+from curvecache import DiskCurveCache
+
+
+class ProjectFile:
+    FORMAT: str = "automod-project"
+    VERSION: int = 1
+    PARAMETERS: tuple = ("ihg", "hd", "ntl", "ml", "tl", "gs", "tt", "ls")
+
+    def __init__(self, window, storage):
+        self.window = window
+        self.storage = storage
+
+    def save(self, file_name, embed_curves=False):
+        parameters = self.window.get_parameters()
+        node_indices, positions, def_positions, links = self.storage.get_node_arrays()
+        nodes = self.storage.get_nodes()
+        lattice_types = np.zeros(len(node_indices), dtype=int)
+        lattice_sizes = np.zeros(len(node_indices), dtype=int)
+        ref_points = np.full((len(node_indices), 2), np.nan)
+        cs_angles = np.zeros(len(node_indices))
+        cs_transforms = np.full((len(node_indices), 9), np.nan)
+        helices = []
+        for row, node_index in enumerate(node_indices.tolist()):
+            cross_section = nodes[node_index].node_point.get_cross_section()
+            if cross_section.get_lattice_type() is not None:
+                lattice_types[row] = cross_section.get_lattice_type()
+            if cross_section.get_lattice_size() is not None:
+                lattice_sizes[row] = cross_section.get_lattice_size()
+            if cross_section.get_ref_pos() is not None:
+                ref_points[row] = cross_section.get_ref_pos()
+            cs_angles[row] = cross_section.get_angle()
+            transform = cross_section.get_transform()
+            if transform is not None:
+                cs_transforms[row] = (transform.m11(), transform.m12(), transform.m13(),
+                                      transform.m21(), transform.m22(), transform.m23(),
+                                      transform.m31(), transform.m32(), transform.m33())
+            for helix in cross_section.get_helices().tolist():
+                helices.append((row, *helix))
+        arrays = {
+            'format': np.array(self.FORMAT),
+            'version': np.array(self.VERSION),
+            'parameter_names': np.array(self.PARAMETERS),
+            'parameter_values': np.array([parameters[name] for name in self.PARAMETERS], dtype=float),
+            'view_matrix': np.asarray(self.storage.get_projection().get_matrix(), dtype=float),
+            'view_origin': np.asarray(self.storage.origin, dtype=float),
+            'curve_mode': np.array(self.storage.curve),
+            'node_indices': node_indices,
+            'node_positions': positions,
+            'node_def_positions': def_positions,
+            'links': links,
+            'lattice_types': lattice_types,
+            'lattice_sizes': lattice_sizes,
+            'ref_points': ref_points,
+            'cs_angles': cs_angles,
+            'cs_transforms': cs_transforms,
+            'helices': np.array(sorted(helices), dtype=int).reshape(-1, 5),
+        }
+        curve_keys = []
+        curve_layouts = []
+        if embed_curves:
+            for indices, curve in self.storage.path_curves.items():
+                solution = self.storage.get_curve_cache().get(curve.get_key())
+                if solution is not None:
+                    curve_arrays = {}
+                    layout = DiskCurveCache.encode(solution, curve_arrays)
+                    for name, array in curve_arrays.items():
+                        arrays["curve_{}_{}".format(len(curve_keys), name)] = array
+                    curve_keys.append(curve.get_key())
+                    curve_layouts.append(json.dumps(layout))
+        arrays['curve_keys'] = np.array(curve_keys, dtype=str)
+        arrays['curve_layouts'] = np.array(curve_layouts, dtype=str)
+        with open(file_name, 'wb') as file:
+            np.savez_compressed(file, **arrays)
+
+    def load(self, file_name):
+        with np.load(file_name, allow_pickle=False) as data:
+            if 'format' not in data.files or str(data['format']) != self.FORMAT:
+                raise ValueError("{} is not an AutoMod project file".format(file_name))
+            if int(data['version']) != self.VERSION:
+                raise ValueError("unsupported project file version {}".format(int(data['version'])))
+            arrays = {name: data[name] for name in data.files}
+
+        parameters = self.window.get_parameters()
+        for name, value in zip(arrays['parameter_names'].tolist(), arrays['parameter_values'].tolist()):
+            if name in parameters:
+                parameters[name] = type(parameters[name])(value)
+
+        self.storage.clear_nodes()
+        self.storage.set_view_matrix(arrays['view_matrix'])
+        translation = arrays['view_origin'] - self.storage.origin
+        self.storage.translate_all_points(translation[0], translation[1], translation[2])
+
+        node_indices = arrays['node_indices']
+        helices = arrays['helices']
+        # files written before the lattice sizes were stored leave them to the current setting
+        lattice_sizes = arrays.get('lattice_sizes', np.zeros(len(node_indices), dtype=int))
+        helix_groups = np.split(helices, np.searchsorted(helices[:, 0], np.arange(1, len(node_indices))))
+        cross_sections = []
+        templates = {}
+        for row in range(len(node_indices)):
+            # nodes with identical cross sections share one template, as they would after copy and paste
+            template_key = (arrays['lattice_types'][row].tobytes(), lattice_sizes[row].tobytes(),
+                            arrays['ref_points'][row].tobytes(),
+                            arrays['cs_angles'][row].tobytes(), arrays['cs_transforms'][row].tobytes(),
+                            helix_groups[row][:, 1:].tobytes())
+            if template_key not in templates:
+                templates[template_key] = self.restore_cross_section(arrays['lattice_types'][row],
+                                                                     arrays['ref_points'][row],
+                                                                     arrays['cs_angles'][row],
+                                                                     arrays['cs_transforms'][row], helix_groups[row],
+                                                                     lattice_sizes[row])
+            cross_sections.append(templates[template_key])
+        self.storage.restore_nodes(node_indices, arrays['node_positions'], arrays['node_def_positions'], arrays['links'],
+                                   cross_sections)
+
+        for k, (key, layout) in enumerate(zip(arrays['curve_keys'].tolist(), arrays['curve_layouts'].tolist())):
+            prefix = "curve_{}_".format(k)
+            curve_arrays = {name[len(prefix):]: array for name, array in arrays.items() if name.startswith(prefix)}
+            self.storage.get_curve_cache().put(key, DiskCurveCache.decode(json.loads(layout), curve_arrays))
+        if bool(arrays['curve_mode']):
+            self.storage.interpolate()
+
+    def restore_cross_section(self, lattice_type, ref_pos, cs_angle, cs_transform, helices, lattice_size):
+        ref_point = None
+        if not np.any(np.isnan(ref_pos)):
+            ref_point = (float(ref_pos[0]), float(ref_pos[1]))
+        transform = None
+        if not np.any(np.isnan(cs_transform)):
+            transform = QTransform(*cs_transform.tolist())
+        return CrossSection(int(lattice_type) if lattice_type != 0 else None, ref_point, float(cs_angle), transform,
+                            helices[:, 1:], int(lattice_size) if lattice_size != 0 else None)
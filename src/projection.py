@@ -0,0 +1,86 @@
+import numpy as np
+
+
+class Projection:
+    INITIAL_CAPACITY: int = 1024
+
+    def __init__(self):
+        self.R = np.identity(3)
+        self.positions = np.zeros((self.INITIAL_CAPACITY, 3))
+        self.scene_positions = np.zeros((self.INITIAL_CAPACITY, 3))
+        self.items = [None for _ in range(self.INITIAL_CAPACITY)]
+        self.free_indices = list(range(self.INITIAL_CAPACITY - 1, -1, -1))
+        self.version = 0
+
+    def get_matrix(self):
+        return self.R
+
+    def set_matrix(self, R):
+        self.R = np.array(R, dtype=float)
+        self.project()
+
+    def get_version(self):
+        return self.version
+
+    def grow(self):
+        capacity = len(self.items)
+        self.positions = np.concatenate((self.positions, np.zeros((capacity, 3))))
+        self.scene_positions = np.concatenate((self.scene_positions, np.zeros((capacity, 3))))
+        self.items.extend([None for _ in range(capacity)])
+        self.free_indices.extend(range(2 * capacity - 1, capacity - 1, -1))
+
+    def add_item(self, item, pos_3d):
+        if len(self.free_indices) == 0:
+            self.grow()
+        index = self.free_indices.pop()
+        self.items[index] = item
+        self.positions[index] = pos_3d
+        self.scene_positions[index] = np.matmul(self.R, self.positions[index])
+        return index
+
+    def remove_item(self, index):
+        self.items[index] = None
+        self.positions[index] = 0
+        self.scene_positions[index] = 0
+        self.free_indices.append(index)
+
+    def get_pos_3d(self, index):
+        return self.positions[index].copy()
+
+    def set_pos_3d(self, index, pos_3d):
+        self.positions[index] = pos_3d
+        self.scene_positions[index] = np.matmul(self.R, self.positions[index])
+
+    def get_scene_pos_3d(self, index):
+        return self.scene_positions[index]
+
+    def get_positions(self, indices):
+        return self.positions[indices]
+
+    def set_positions(self, indices, positions):
+        self.positions[indices] = positions
+        self.scene_positions[indices] = np.matmul(positions, self.R.T)
+
+    def project(self):
+        self.scene_positions = np.matmul(self.positions, self.R.T)
+        self.version += 1
+
+    def rotate(self, R):
+        self.R = np.matmul(R, self.R)
+        self.project()
+
+    def translate(self, translation):
+        self.positions = self.positions + translation
+        self.project()
+
+    def update_items(self, indices=None):
+        if indices is None:
+            items = self.items
+            scene_positions = self.scene_positions
+        else:
+            items = [self.items[index] for index in indices]
+            scene_positions = self.scene_positions[indices]
+        for item, scene_pos in zip(items, scene_positions.tolist()):
+            if item is not None:
+                item.setPos(scene_pos[0], scene_pos[2])
+                item.setZValue(scene_pos[1] + 2)
@@ -0,0 +1,135 @@
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+
+from PySide6.QtWidgets import QApplication
+
+from computebackend import ReferenceBackend, get_backend_names
+from conformance import solve_design
+from mainwindow import MainWindow
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+CORPUS = os.path.join(ROOT, "regression")
+TEMPLATES = os.path.join(ROOT, "simulations")
+DESIGNS = ("S_automod_redesign", "S_perfect_replica")
+
+
+def write_design(template, maps):
+    # the design is written the same way as with the write tool, into a copy of the caDNAno template
+    dct = copy.deepcopy(template)
+    start = time.perf_counter()
+    messages = MainWindow.write_mod_map(dct, *maps)
+    elapsed = time.perf_counter() - start
+    return dct, messages, elapsed
+
+
+def collect_edits(dct):
+    # loops, skips and crossovers of every helix as sorted (base, kind, value) rows
+    edits = {}
+    for strand in dct.get("vstrands", []):
+        rows = [(i, "loop", value) for i, value in enumerate(strand["loop"]) if value != 0]
+        rows += [(i, "skip", value) for i, value in enumerate(strand["skip"]) if value != 0]
+        for kind in ("scaf", "stap"):
+            for i, pos in enumerate(strand[kind]):
+                for slot in (0, 2):
+                    if pos[slot] != strand["num"] and pos[slot] != -1:
+                        rows.append((i, "{} {}".format(kind, slot), pos[slot]))
+        edits[strand["num"]] = sorted(rows, key=lambda row: (row[1], row[0], row[2]))
+    return edits
+
+
+def compare_edits(expected, actual, shift):
+    differences = []
+    for num in sorted(set(expected) | set(actual)):
+        if num not in expected or num not in actual:
+            differences.append("helix {} is missing from one of the outputs".format(num))
+            continue
+        for kind in sorted({row[1] for row in expected[num] + actual[num]}):
+            rows = [row for row in expected[num] if row[1] == kind]
+            other_rows = [row for row in actual[num] if row[1] == kind]
+            if len(rows) != len(other_rows):
+                differences.append("helix {} has {} {} edits instead of {}".format(num, len(other_rows), kind,
+                                                                                  len(rows)))
+            elif any(row[2] != other_row[2] or abs(row[0] - other_row[0]) > shift
+                     for row, other_row in zip(rows, other_rows)):
+                moved = sum(row != other_row for row, other_row in zip(rows, other_rows))
+                differences.append("helix {} has {} {} edits out of place".format(num, moved, kind))
+    return differences
+
+
+def run_design(window, name, backend, corpus, templates, repeat=1):
+    # the fastest of the repeated solve and write times is reported
+    with open(os.path.join(templates, name, name + ".json"), "r", encoding="utf-8") as f:
+        template = json.load(f)
+    solve_times = []
+    write_times = []
+    for _ in range(max(repeat, 1)):
+        maps, elapsed = solve_design(window, os.path.join(corpus, name + ".amod"), backend)
+        solve_times.append(elapsed)
+        if len(maps) != 1:
+            raise ValueError("{} has {} curves instead of one".format(name, len(maps)))
+        dct, messages, elapsed = write_design(template, next(iter(maps.values())))
+        write_times.append(elapsed)
+    return dct, messages, min(solve_times), min(write_times)
+
+
+def expected_file_name(corpus, name):
+    return os.path.join(corpus, name + "_expected.json")
+
+
+def check_output(corpus, name, dct, messages, shift=0):
+    with open(expected_file_name(corpus, name), "r", encoding="utf-8") as f:
+        expected = json.load(f)
+    differences = messages + compare_edits(collect_edits(expected), collect_edits(dct), shift)
+    if not differences and shift == 0 and dct != expected:
+        differences.append("the caDNAno files differ outside of the loops, skips and crossovers")
+    return differences
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve the regression designs and compare the loops, skips and "
+                                                 "crossovers written to their caDNAno files with the recorded ones.")
+    parser.add_argument('designs', nargs='*', default=list(DESIGNS), help="design names, by default all of them")
+    parser.add_argument('--corpus', default=CORPUS,
+                        help="directory with the design project files and the expected caDNAno files")
+    parser.add_argument('--templates', default=TEMPLATES,
+                        help="directory with the caDNAno files the designs are written to")
+    parser.add_argument('--backend', default=ReferenceBackend.NAME, choices=get_backend_names())
+    parser.add_argument('--shift', type=int, default=0,
+                        help="number of bases an edit may move, by default the outputs have to match exactly")
+    parser.add_argument('--repeat', type=int, default=1, help="number of timed runs, the fastest one is reported")
+    parser.add_argument('--record', action='store_true', help="overwrite the expected files with the current output")
+    arguments = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication(sys.argv[:1])
+    window = MainWindow()
+    failures = 0
+    for name in arguments.designs:
+        try:
+            dct, messages, solve_time, write_time = run_design(window, name, arguments.backend, arguments.corpus,
+                                                               arguments.templates, arguments.repeat)
+        except ValueError as error:
+            print("{}: {}".format(name, error))
+            failures += 1
+            continue
+        timing = "solve {:.3f} s write {:.3f} s".format(solve_time, write_time)
+        if arguments.record:
+            with open(expected_file_name(arguments.corpus, name), "w", encoding="utf-8") as f:
+                json.dump(dct, f)
+            print("{}: {} {} recorded".format(name, arguments.backend, timing))
+            continue
+        differences = check_output(arguments.corpus, name, dct, messages, arguments.shift)
+        print("{}: {} {} {}".format(name, arguments.backend, timing, "matches" if not differences else "DIFFERS"))
+        for difference in differences:
+            print("    " + difference)
+        failures += len(differences) > 0
+    app.quit()
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,170 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from PySide6.QtWidgets import QApplication
+
+from computebackend import NumpyBackend, get_backend_names
+from crosssection import CrossSection
+from curveview import CurveView
+from mainwindow import MainWindow
+
+# honeycomb lattice indices of an 18 helix bundle, the design uses the first ones
+HELIX_LAYOUT = ((0, 0), (0, 1), (1, 0), (1, 1), (2, 0), (2, 1), (2, 2), (2, 3), (1, 2), (1, 3), (0, 2), (0, 3),
+                (0, 4), (0, 5), (1, 4), (1, 5), (2, 4), (2, 5))
+SEQUENCES = ("rotate", "translate", "zoom")
+
+
+class ItemTimer:
+    # wraps paint and boundingRect of the item classes to collect their call counts and times
+    METHODS: tuple = ("paint", "boundingRect")
+
+    def __init__(self, classes):
+        self.classes = sorted(classes, key=lambda cls: cls.__name__)
+        self.originals = {}
+        self.counts = {}
+        self.times = {}
+
+    def install(self):
+        for cls in self.classes:
+            for name in self.METHODS:
+                if name in cls.__dict__:
+                    self.originals[(cls, name)] = cls.__dict__[name]
+                    setattr(cls, name, self.wrap(cls.__name__, name, cls.__dict__[name]))
+
+    def remove(self):
+        for (cls, name), method in self.originals.items():
+            setattr(cls, name, method)
+        self.originals.clear()
+
+    def wrap(self, class_name, name, method):
+        key = (class_name, name)
+
+        def timed(*args):
+            start = time.perf_counter()
+            result = method(*args)
+            self.times[key] = self.times.get(key, 0.0) + time.perf_counter() - start
+            self.counts[key] = self.counts.get(key, 0) + 1
+            return result
+        return timed
+
+    def reset(self):
+        self.counts.clear()
+        self.times.clear()
+
+    def get_rows(self):
+        return [(key, self.counts[key], self.times[key]) for key in sorted(self.counts)]
+
+
+def build_design(window, nodes, paths, helices, lines):
+    storage = window.scene.get_storage()
+    parameters = window.get_parameters()
+    layout = np.array(HELIX_LAYOUT[:helices], dtype=int).reshape(-1, 2)
+    table = np.column_stack((layout, np.arange(len(layout)), np.full(len(layout), -1)))
+    positions = CrossSection.lattice_positions(1, layout[:, 0], layout[:, 1], parameters)
+    cross_section = CrossSection(1, tuple(np.mean(positions, axis=0).tolist()), 0, None, table)
+    # every path is a gentle wave along x, the paths are stacked along z
+    k = np.arange(nodes)
+    wave = np.column_stack((6.0 * (k - (nodes - 1) / 2), 4.0 * np.sin(k * np.pi / 4), 4.0 * np.cos(k * np.pi / 4)))
+    node_indices = np.arange(nodes * paths)
+    def_positions = np.concatenate([wave + np.array([0, 0, 20.0 * (p - (paths - 1) / 2)]) for p in range(paths)])
+    links = np.array([(p * nodes + i, p * nodes + i + 1) for p in range(paths) for i in range(nodes - 1)],
+                     dtype=int).reshape(-1, 2)
+    storage.restore_nodes(node_indices, def_positions + storage.origin, def_positions, links,
+                          [cross_section] * len(node_indices))
+    if not lines:
+        storage.interpolate()
+
+
+def play_sequence(window, name, frames, timer):
+    storage = window.scene.get_storage()
+    view = window.view
+    w = window.scene.get_w()
+    update_time = 0.0
+    render_time = 0.0
+    timer.reset()
+    start = time.perf_counter()
+    for frame in range(frames):
+        # the steps mirror the ones of the mouse tools in CurveView, the second half returns to the start
+        sign = 1 if frame < frames / 2 else -1
+        step_start = time.perf_counter()
+        if name == "rotate":
+            rotation = (CurveView.rotation_matrix_x, CurveView.rotation_matrix_y,
+                        CurveView.rotation_matrix_z)[frame % 3]
+            storage.rotate_all_points(rotation(sign * 2 * np.pi / frames))
+        elif name == "translate":
+            translation = np.zeros(3)
+            translation[frame % 3] = sign * w / 4
+            storage.translate_all_points(*translation)
+            storage.update_grid()
+        else:
+            delta = 1.02 if sign > 0 else 1 / 1.02
+            view.scale(delta, delta)
+            view.zoom_amount = view.zoom_amount * delta
+        render_start = time.perf_counter()
+        view.viewport().repaint()
+        update_time += render_start - step_start
+        render_time += time.perf_counter() - render_start
+    return time.perf_counter() - start, update_time, render_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay scripted rotations, translations and zooms of an offscreen "
+                                                 "curve view and report the frame rate and the time spent in the "
+                                                 "paint and boundingRect methods of every item type.")
+    parser.add_argument('--grid-scale', type=float, default=20, help="distance between grid points")
+    parser.add_argument('--grid-extent', type=int, default=4, help="number of grid points on each side of the center")
+    parser.add_argument('--nodes', type=int, default=12, help="number of nodes on each path")
+    parser.add_argument('--paths', type=int, default=1, help="number of paths")
+    parser.add_argument('--helices', type=int, default=6, choices=range(1, len(HELIX_LAYOUT) + 1),
+                        metavar="[1-{}]".format(len(HELIX_LAYOUT)), help="number of helices in the cross sections")
+    parser.add_argument('--lines', action='store_true', help="leave the paths as lines instead of curves")
+    parser.add_argument('--frames', type=int, default=60, help="number of frames in each sequence")
+    parser.add_argument('--sequences', default=",".join(SEQUENCES),
+                        help="comma separated sequences to replay, by default " + ",".join(SEQUENCES))
+    parser.add_argument('--size', default="1200x900", help="window size as WIDTHxHEIGHT")
+    parser.add_argument('--backend', default=NumpyBackend.NAME, choices=get_backend_names(),
+                        help="compute backend used to solve the curves")
+    arguments = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication(sys.argv[:1])
+    window = MainWindow()
+    window.resize(*(int(value) for value in arguments.size.lower().split("x")))
+    window.get_parameters()['cb'] = arguments.backend
+    window.spin_grid_scale_action(arguments.grid_scale)
+    window.scene.set_size(2 * arguments.grid_extent * arguments.grid_scale)
+    window.scene.get_storage().redraw_grid()
+    start = time.perf_counter()
+    build_design(window, arguments.nodes, arguments.paths, arguments.helices, arguments.lines)
+    print("design: {} paths of {} nodes, {} curves, {} scene items, built in {:.3f} s".format(
+        arguments.paths, arguments.nodes, len(window.scene.get_storage().path_curves), len(window.scene.items()),
+        time.perf_counter() - start))
+    window.show()
+    app.processEvents()
+
+    timer = ItemTimer({type(item) for item in window.scene.items()})
+    timer.install()
+    try:
+        for name in arguments.sequences.split(","):
+            if name not in SEQUENCES:
+                print("{}: unknown sequence".format(name))
+                continue
+            elapsed, update_time, render_time = play_sequence(window, name, arguments.frames, timer)
+            print("{}: {} frames {:.1f} fps, update {:.2f} ms, render {:.2f} ms per frame".format(
+                name, arguments.frames, arguments.frames / elapsed, 1000 * update_time / arguments.frames,
+                1000 * render_time / arguments.frames))
+            for (class_name, method), count, total in timer.get_rows():
+                print("    {:<12} {:<12} {:>8} calls {:>9.2f} ms per frame".format(
+                    class_name, method, count, 1000 * total / arguments.frames))
+    finally:
+        timer.remove()
+    app.quit()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,46 @@
+import numpy as np
+from scipy import spatial
+
+
+class SpatialIndex:
+
+    def __init__(self, projection):
+        self.projection = projection
+        self.items = []
+        self.tree = None
+        self.valid = False
+        self.version = None
+
+    def invalidate(self):
+        self.valid = False
+
+    def rebuild(self, items):
+        self.items = list(items)
+        if len(self.items) >= 1:
+            indices = [item.get_projection_index() for item in self.items]
+            scene_positions = self.projection.scene_positions[indices]
+            self.tree = spatial.cKDTree(scene_positions[:, [0, 2]])
+        else:
+            self.tree = None
+        self.valid = True
+        self.version = self.projection.get_version()
+
+    def is_current(self):
+        return self.valid and self.version == self.projection.get_version()
+
+    def query(self, x, y, radius):
+        if self.tree is None:
+            return None
+        d, i = self.tree.query(np.array([x, y]), distance_upper_bound=np.nextafter(radius, np.inf))
+        if np.isinf(d):
+            return None
+        return self.items[i]
+
+    def query_nearest(self, x, y):
+        if self.tree is None:
+            return []
+        d, i = self.tree.query(np.array([x, y]))
+        indices = self.tree.query_ball_point(np.array([x, y]), d)
+        if i not in indices:
+            indices.append(i)
+        return [self.items[j] for j in indices]
@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+
+@pytest.fixture(scope="session")
+def window():
+    from PySide6.QtWidgets import QApplication
+    from mainwindow import MainWindow
+
+    app = QApplication.instance() or QApplication([])
+    window = MainWindow()
+    yield window
+    app.quit()
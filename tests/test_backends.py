@@ -0,0 +1,27 @@
+import os
+
+import pytest
+
+from computebackend import BACKENDS, CompiledBackend, ReferenceBackend, get_backend
+from conformance import compare_maps, solve_design
+from kernels import REFERENCE, has_compiler
+from regression import CORPUS, DESIGNS
+
+
+@pytest.fixture(scope="module")
+def reference_maps(window):
+    return {name: solve_design(window, os.path.join(CORPUS, name + ".amod"), ReferenceBackend.NAME)[0]
+            for name in DESIGNS}
+
+
+@pytest.mark.parametrize('name', DESIGNS)
+@pytest.mark.parametrize('backend', [name for name in BACKENDS if name != ReferenceBackend.NAME])
+def test_backend_conforms_to_reference(window, reference_maps, backend, name):
+    if backend == CompiledBackend.NAME and not has_compiler():
+        pytest.skip("numba is not installed, the compiled backend would fall back to the NumPy one")
+    # a fallback would compare another backend than the one asked for
+    assert get_backend(backend).get_name() == backend
+    if backend == CompiledBackend.NAME:
+        assert get_backend(backend).kernels is not REFERENCE
+    maps, _ = solve_design(window, os.path.join(CORPUS, name + ".amod"), backend)
+    assert compare_maps(reference_maps[name], maps) == []
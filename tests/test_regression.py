@@ -0,0 +1,10 @@
+import pytest
+
+from computebackend import ReferenceBackend
+from regression import CORPUS, DESIGNS, TEMPLATES, check_output, run_design
+
+
+@pytest.mark.parametrize('name', DESIGNS)
+def test_design_matches_recorded_output(window, name):
+    dct, messages, _, _ = run_design(window, name, ReferenceBackend.NAME, CORPUS, TEMPLATES)
+    assert check_output(CORPUS, name, dct, messages) == []